@@ -58,12 +58,16 @@ from typing import Dict, Any, Optional
 
 # Flask imports
 from flask import Flask, jsonify, request, send_file, Response, render_template
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 
 # Import our analysis engine
 print("DEBUG: Importing SixfoldAnalysisEngine...", file=sys.stdout, flush=True)
 from sixfold_analysis_engine import (
     SixfoldAnalysisEngine,
+    iter_jsonl,
+    dumps_json,
+    orjson,
     OUTPUT_DIR,
     NETWORK_DIR,
     DASHBOARD_DIR,
@@ -104,6 +108,20 @@ IS_PRODUCTION = IS_RAILWAY is not None
 
 app = Flask(__name__)
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    jsonify through the engine's dumps_json: each response envelope,
+    including whole lists of section results, is encoded in one orjson call.
+    """
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return dumps_json(obj)
+
+
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
 # =============================================================================
 # CORS CONFIGURATION
 # =============================================================================
@@ -756,6 +774,37 @@ def export_query_json(query_id: str):
     )
 
 
+@app.route('/api/export/jsonl/<query_id>', methods=['GET'])
+@handle_exceptions
+def export_query_jsonl(query_id: str):
+    """
+    Export a specific query result as JSON Lines, streamed row by row.
+    
+    Path Parameters:
+    ----------------
+    query_id : str
+        Query identifier
+        
+    Returns:
+    --------
+    JSONL file download (metadata line, then one line per row)
+    """
+    engine = get_engine()
+    result = engine.get_result(query_id)
+    
+    if result is None:
+        return error_response(f"Query result not found: {query_id}", 404)
+    
+    header = {key: value for key, value in result.items() if key != 'data'}
+    return Response(
+        iter_jsonl(header, result.get('data') or []),
+        mimetype='application/x-ndjson',
+        headers={
+            'Content-Disposition': f'attachment; filename=query_{query_id}.jsonl'
+        }
+    )
+
+
 @app.route('/api/export/network/<format>', methods=['GET'])
 @handle_exceptions
 def export_network(format: str):
@@ -31,7 +31,7 @@ from pathlib import Path
 
 # Add project root to path to import config
 sys.path.insert(0, '/home/gusrodgs/Gus/cienciaDeDados/phdMutley/scripts')
-from config import CONFIG, PDF_DOWNLOAD_DIR, DATABASE_FILE, LOGS_DIR, TRIAL_BATCH_CONFIG
+from config import CONFIG, PDF_DOWNLOAD_DIR, DATABASE_FILE, LOGS_DIR, TRIAL_BATCH_CONFIG, read_database_excel
 
 # ============================================================================
 # LOGGING CONFIGURATION
@@ -205,7 +205,7 @@ if __name__ == "__main__":
         
     # Load Data
     try:
-        df = pd.read_excel(DATABASE_FILE)
+        df = read_database_excel()
         logging.info(f"Loaded database with {len(df)} rows.")
     except Exception as e:
         logging.error(f"Failed to read database: {e}")
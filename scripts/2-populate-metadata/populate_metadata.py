@@ -31,10 +31,16 @@ Date: November 2025
 
 import sys
 import os
+import itertools
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from operator import attrgetter
 from datetime import datetime
+from functools import lru_cache
 import pandas as pd
 import logging
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, literal_column, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.engine import URL
 from tqdm import tqdm
@@ -49,7 +55,8 @@ sys.path.insert(0, PROJECT_ROOT)
 sys.path.insert(0, os.path.join(PROJECT_ROOT, 'scripts'))
 
 # Import config
-from config import CONFIG, DB_CONFIG, DATABASE_FILE, UUID_NAMESPACE, LOGS_DIR, TRIAL_BATCH_CONFIG
+from config import (CONFIG, DB_CONFIG, UUID_NAMESPACE, LOGS_DIR, TRIAL_BATCH_CONFIG,
+                    read_database_excel)
 
 # Import database models
 sys.path.insert(0, os.path.join(PROJECT_ROOT, 'scripts', '0-initialize-database'))
@@ -160,69 +167,154 @@ def parse_date(date_value):
 def extract_timeline_dates(first_event, last_event):
     return parse_date(first_event), parse_date(last_event)
 
+@lru_cache(maxsize=None)
 def generate_case_uuid(case_id_str):
-    """Generate deterministic UUID using project namespace."""
+    """Generate deterministic UUID using project namespace (memoized)."""
     clean_id = str(case_id_str).strip().lower()
     return uuid5(UUID_NAMESPACE, f"case_{clean_id}")
 
+@lru_cache(maxsize=None)
 def generate_document_uuid(document_id_str):
-    """Generate deterministic UUID for a document."""
+    """Generate deterministic UUID for a document (memoized)."""
     clean_id = str(document_id_str).strip().lower()
     return uuid5(UUID_NAMESPACE, f"document_{clean_id}")
 
+# Excel columns used by this script, renamed to identifiers so rows can be
+# iterated with itertuples() (plain namedtuples, no per-row Series)
+COLUMN_FIELDS = {
+    'Case ID': 'case_id',
+    'Case Name': 'case_name',
+    'Case Number': 'case_number',
+    'Jurisdictions': 'jurisdictions',
+    'Geographies': 'geographies',
+    'Geography ISOs': 'geography_isos',
+    'First event in timeline': 'first_event',
+    'Last event in timeline': 'last_event',
+    'Status': 'status',
+    'Case URL': 'case_url',
+    'Case Summary': 'case_summary',
+    'Principal Laws': 'principal_laws',
+    'At Issue': 'at_issue',
+    'Bundle Name(s)': 'bundle_names',
+    'Case Categories': 'case_categories',
+    'Full timeline of events (types)': 'timeline_types',
+    'Full timeline of events (dates)': 'timeline_dates',
+    'Document ID': 'document_id',
+    'Document Type': 'document_type',
+    'Document Content URL': 'document_url',
+    'Document Title': 'document_title',
+    'Document Summary': 'document_summary',
+    'Document Variant': 'document_variant',
+    'Internal Document ID': 'internal_document_id',
+    'Language(s)': 'languages',
+}
+
+# Semicolon-delimited columns stored as JSON arrays in metadata_data
+# (metadata key -> row field)
+CASE_LIST_COLUMNS = {
+    'case_categories': 'case_categories',
+    'timeline_types': 'timeline_types',
+    'timeline_dates': 'timeline_dates',
+    'geography_isos': 'geography_isos',
+    'geographies_full': 'geographies'
+}
+
+DOCUMENT_LIST_COLUMNS = {
+    'languages': 'languages',
+    'bundle_names': 'bundle_names'
+}
+
+SPLIT_PREFIX = 'split_'
+
+# Fixed row layout handed to worker processes (a module-level namedtuple is
+# picklable, unlike the ad-hoc class itertuples() creates)
+ROW_FIELDS = tuple(COLUMN_FIELDS.values()) + tuple(
+    SPLIT_PREFIX + field
+    for field in dict.fromkeys(list(CASE_LIST_COLUMNS.values()) + list(DOCUMENT_LIST_COLUMNS.values()))
+)
+ExcelRow = namedtuple('ExcelRow', ROW_FIELDS)
+
+# Cases sent to each metadata worker per IPC round-trip
+PAYLOAD_CHUNKSIZE = 64
+
+def has_value(value):
+    """NaN-safe presence check for raw itertuples() values."""
+    return value is not None and value == value
+
+def prepare_rows_frame(df):
+    """
+    Keep only the columns this script reads, renamed per COLUMN_FIELDS.
+    Missing columns are added as empty so attribute access never fails.
+    """
+    frame = df[[c for c in COLUMN_FIELDS if c in df.columns]].rename(columns=COLUMN_FIELDS)
+    for field in COLUMN_FIELDS.values():
+        if field not in frame.columns:
+            frame[field] = None
+    return frame
+
+def presplit_list_columns(df, columns):
+    """
+    Split semicolon-delimited columns once for the whole DataFrame.
+    Each column gets an auxiliary 'split_<col>' column holding a list of
+    stripped values (or None when the cell is empty), so the per-row
+    metadata builder no longer re-splits the same strings.
+    """
+    for col in columns:
+        if col not in df.columns:
+            continue
+        split_col = SPLIT_PREFIX + col
+        if split_col in df.columns:
+            continue
+        mask = df[col].notna()
+        split = df[col].where(mask, '').astype(str).str.split(';')
+        df[split_col] = [
+            ([x.strip() for x in parts if x.strip()] or None) if present else None
+            for parts, present in zip(split, mask)
+        ]
+    return df
+
 def create_metadata_json(row, metadata_type='case'):
     """
-    Create JSON metadata from Excel row.
-    Splits list-like strings into actual JSON arrays.
+    Create JSON metadata from an itertuples() row.
+    List-like columns are read from the 'split_' columns prepared by
+    presplit_list_columns().
     """
     metadata = {}
     
     if metadata_type == 'case':
         # Simple text fields
         text_mappings = {
-            'case_summary': 'Case Summary',
-            'principal_laws': 'Principal Laws',
-            'at_issue': 'At Issue',
-            'bundles': 'Bundle Name(s)',
-            'Geographies': 'Geographies'  # FIX: Add for backward compatibility with v5 citation extraction
+            'case_summary': 'case_summary',
+            'principal_laws': 'principal_laws',
+            'at_issue': 'at_issue',
+            'bundles': 'bundle_names',
+            'Geographies': 'geographies'  # FIX: Add for backward compatibility with v5 citation extraction
         }
-        for key, col in text_mappings.items():
-            if pd.notna(row.get(col)):
-                metadata[key] = str(row[col])
-
-        # List fields (Split by semicolon)
-        list_mappings = {
-            'case_categories': 'Case Categories',
-            'timeline_types': 'Full timeline of events (types)',
-            'timeline_dates': 'Full timeline of events (dates)',
-            'geography_isos': 'Geography ISOs',
-            'geographies_full': 'Geographies'
-        }
-        
-        for key, col in list_mappings.items():
-            if pd.notna(row.get(col)):
-                metadata[key] = [x.strip() for x in str(row[col]).split(';') if x.strip()]
+        list_mappings = CASE_LIST_COLUMNS
     
     elif metadata_type == 'document':
         text_mappings = {
-            'document_title': 'Document Title',
-            'document_summary': 'Document Summary',
-            'document_variant': 'Document Variant',
-            'internal_document_id': 'Internal Document ID',
-            'original_document_id': 'Document ID'
-        }
-        for key, col in text_mappings.items():
-            if pd.notna(row.get(col)):
-                metadata[key] = str(row[col])
-
-        # List fields
-        list_mappings = {
-            'languages': 'Language(s)',
-            'bundle_names': 'Bundle Name(s)'
+            'document_title': 'document_title',
+            'document_summary': 'document_summary',
+            'document_variant': 'document_variant',
+            'internal_document_id': 'internal_document_id',
+            'original_document_id': 'document_id'
         }
-        for key, col in list_mappings.items():
-            if pd.notna(row.get(col)):
-                metadata[key] = [x.strip() for x in str(row[col]).split(';') if x.strip()]
+        list_mappings = DOCUMENT_LIST_COLUMNS
+    
+    else:
+        return None
+
+    for key, field in text_mappings.items():
+        value = getattr(row, field)
+        if has_value(value):
+            metadata[key] = str(value)
+
+    # List fields (already split by semicolon)
+    for key, field in list_mappings.items():
+        values = getattr(row, SPLIT_PREFIX + field)
+        if values:
+            metadata[key] = values
     
     return metadata if metadata else None
 
@@ -282,67 +374,103 @@ def apply_trial_batch_filter(df):
 # DATABASE POPULATION LOGIC
 # ============================================================================
 
-def process_case(row, session):
-    case_uuid = str(generate_case_uuid(row['Case ID']))
-    existing_case = session.query(Case).filter(Case.case_id == case_uuid).first()
+def optional_str(value):
+    return str(value) if has_value(value) else None
+
+def build_case_data(row):
+    """Build (case_uuid, column values) for a case from its first row. No DB access."""
+    case_uuid = str(generate_case_uuid(row.case_id))
     
-    court_name = parse_jurisdiction(row.get('Jurisdictions'))
-    country = parse_country_from_geographies(row.get('Geographies'))
-    region = parse_region(row.get('Geography ISOs'))
+    court_name = parse_jurisdiction(row.jurisdictions)
+    region = parse_region(row.geography_isos)
     filing_date, decision_date = extract_timeline_dates(
-        row.get('First event in timeline'),
-        row.get('Last event in timeline')
+        row.first_event,
+        row.last_event
     )
     
     metadata = create_metadata_json(row, metadata_type='case')
     
     case_data = {
-        'case_name': str(row['Case Name']),
-        'case_number': str(row['Case Number']) if pd.notna(row.get('Case Number')) else None,
+        'case_name': str(row.case_name),
+        'case_number': optional_str(row.case_number),
         'jurisdiction': court_name,
-        'geographies': str(row['Geographies']) if pd.notna(row.get('Geographies')) else None,  # FIX: Populate geographies column
+        'geographies': optional_str(row.geographies),  # FIX: Populate geographies column
         'region': region,
         'case_filing_year': filing_date.year if filing_date else None,
         'last_event_date': decision_date,
-        'case_status': str(row['Status']) if pd.notna(row.get('Status')) else None,
-        'case_url': str(row['Case URL']) if pd.notna(row.get('Case URL')) else None,
+        'case_status': optional_str(row.status),
+        'case_url': optional_str(row.case_url),
         # 'data_source': 'climatecasechart.com', # Removed as it's not in the model
         'metadata_data': metadata  # Maps to DB column 'metadata_data'
     }
-    
-    if existing_case:
-        for key, value in case_data.items():
-            setattr(existing_case, key, value)
-        existing_case.updated_at = datetime.now()
-        return existing_case, 'updated'
-    else:
-        case = Case(case_id=case_uuid, **case_data)
-        session.add(case)
-        return case, 'created'
+    return case_uuid, case_data
 
-def process_document(row, case, session):
-    doc_uuid = generate_document_uuid(row['Document ID'])
-    existing_doc = session.query(Document).filter(Document.document_id == doc_uuid).first()
+def build_document_data(row, case_uuid):
+    """Build (doc_uuid, column values) for a document row. No DB access."""
+    doc_uuid = generate_document_uuid(row.document_id)
     metadata = create_metadata_json(row, metadata_type='document')
     
     doc_data = {
-        'case_id': case.case_id,
-        'document_type': str(row['Document Type']) if pd.notna(row.get('Document Type')) else 'Decision',
-        'document_url': str(row['Document Content URL']) if pd.notna(row.get('Document Content URL')) else None,
+        'case_id': case_uuid,
+        'document_type': optional_str(row.document_type) or 'Decision',
+        'document_url': optional_str(row.document_url),
         'metadata_data': metadata  # Maps to DB column 'metadata_data'
     }
+    return doc_uuid, doc_data
+
+def build_case_payload(case_rows):
+    """
+    Worker function: turn one case's rows into plain dicts ready for the
+    DB writer. Runs in a child process, so errors are returned, not raised.
+    """
+    case_id = case_rows[0].case_id
+    try:
+        case_uuid, case_data = build_case_data(case_rows[0])
+        documents = [build_document_data(row, case_uuid) for row in case_rows]
+        return {'case_id': case_id, 'case_uuid': case_uuid,
+                'case_data': case_data, 'documents': documents}
+    except Exception as e:
+        return {'case_id': case_id, 'error': str(e)}
+
+def process_case(case_uuid, case_data, session):
+    """
+    Upsert a case in one statement. Postgres resolves the case_id conflict
+    and reports through xmax whether the row was inserted or updated.
+    """
+    case_table = Case.__table__
+    stmt = pg_insert(case_table).values(case_id=case_uuid, **case_data)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[case_table.c.case_id],
+        set_={**case_data, 'updated_at': datetime.now()}
+    ).returning(literal_column('(xmax = 0)').label('inserted'))
+    
+    inserted = session.execute(stmt).scalar()
+    return case_uuid, 'created' if inserted else 'updated'
+
+def process_document(doc_uuid, doc_data, session, existing_doc_ids, to_create):
+    """
+    Update an existing document with a single UPDATE (no SELECT), or queue a
+    new one as a plain mapping in to_create (keyed by UUID) for
+    bulk_insert_mappings.
+    """
+    if doc_uuid in to_create:
+        # Same Document ID repeated within the case: last row wins
+        to_create[doc_uuid].update(doc_data)
+        return to_create[doc_uuid], 'updated'
     
-    if existing_doc:
-        for key, value in doc_data.items():
-            # Don't overwrite download/extraction fields
-            if key not in ['pdf_file_path', 'file_size_bytes', 'page_count', 
-                           'pdf_downloaded', 'download_date', 'download_error']:
-                setattr(existing_doc, key, value)
-        existing_doc.updated_at = datetime.now()
-        return existing_doc, 'updated'
+    if doc_uuid in existing_doc_ids:
+        # Don't overwrite download/extraction fields
+        values = {key: value for key, value in doc_data.items()
+                  if key not in ['pdf_file_path', 'file_size_bytes', 'page_count', 
+                                 'pdf_downloaded', 'download_date', 'download_error']}
+        values['updated_at'] = datetime.now()
+        session.execute(
+            update(Document).where(Document.document_id == doc_uuid).values(**values)
+        )
+        return values, 'updated'
     else:
-        doc = Document(document_id=doc_uuid, pdf_downloaded=False, **doc_data)
-        session.add(doc)
+        doc = dict(document_id=doc_uuid, pdf_downloaded=False, **doc_data)
+        to_create[doc_uuid] = doc
         return doc, 'created'
 
 def populate_database():
@@ -353,7 +481,7 @@ def populate_database():
     
     logging.info("Loading Excel database...")
     try:
-        df = pd.read_excel(DATABASE_FILE)
+        df = read_database_excel(columns=list(COLUMN_FIELDS) + [TRIAL_BATCH_CONFIG['COLUMN_NAME']])
         original_count = len(df)
         logging.info(f"Loaded database with {original_count} rows.")
         
@@ -370,30 +498,62 @@ def populate_database():
         
     stats['total_rows'] = len(df)
 
+    # Rename to identifiers and split list-valued columns once instead of per row
+    df = prepare_rows_frame(df)
+    df = presplit_list_columns(
+        df, set(CASE_LIST_COLUMNS.values()) | set(DOCUMENT_LIST_COLUMNS.values())
+    )
+    df = df[list(ROW_FIELDS)]
+
     session = SessionLocal()
     
     try:
-        case_groups = df.groupby('Case ID')
+        # Prefetch existing document IDs so new documents skip the per-row
+        # SELECT and go through bulk_insert_mappings
+        existing_doc_ids = {doc_id for (doc_id,) in session.query(Document.document_id)}
         
-        for case_id, case_rows in tqdm(case_groups, desc="Processing cases"):
-            try:
-                case_row = case_rows.iloc[0]
-                case, c_status = process_case(case_row, session)
-                
-                if c_status == 'created': stats['cases_created'] += 1
-                else: stats['cases_updated'] += 1
-                
-                for _, doc_row in case_rows.iterrows():
-                    doc, d_status = process_document(doc_row, case, session)
-                    if d_status == 'created': stats['docs_created'] += 1
-                    else: stats['docs_updated'] += 1
-                
-                session.commit()
+        # Sort once and stream groups with itertools.groupby rather than
+        # building a pandas group index (rows without a Case ID are dropped,
+        # as DataFrame.groupby did)
+        df = df[df['case_id'].notna()].sort_values('case_id', kind='mergesort')
+        rows = map(ExcelRow._make, df.itertuples(index=False, name=None))
+        case_groups = (list(group) for _, group in itertools.groupby(rows, key=attrgetter('case_id')))
+        
+        # Parallel metadata build, single-threaded DB writer: the session
+        # never leaves this process
+        with ProcessPoolExecutor(max_workers=CONFIG['MAX_WORKERS']) as executor:
+            payloads = executor.map(build_case_payload, case_groups, chunksize=PAYLOAD_CHUNKSIZE)
+            
+            for payload in tqdm(payloads, total=df['case_id'].nunique(), desc="Processing cases"):
+                case_id = payload['case_id']
+                if 'error' in payload:
+                    stats['errors'] += 1
+                    logging.error(f"Error processing case {case_id}: {payload['error']}")
+                    continue
                 
-            except Exception as e:
-                session.rollback()
-                stats['errors'] += 1
-                logging.error(f"Error processing case {case_id}: {e}")
+                try:
+                    case_uuid, c_status = process_case(payload['case_uuid'], payload['case_data'], session)
+                    
+                    if c_status == 'created': stats['cases_created'] += 1
+                    else: stats['cases_updated'] += 1
+                    
+                    to_create = {}
+                    for doc_uuid, doc_data in payload['documents']:
+                        doc, d_status = process_document(doc_uuid, doc_data, session,
+                                                         existing_doc_ids, to_create)
+                        if d_status == 'created': stats['docs_created'] += 1
+                        else: stats['docs_updated'] += 1
+                    
+                    if to_create:
+                        session.bulk_insert_mappings(Document, list(to_create.values()))
+                    
+                    session.commit()
+                    existing_doc_ids.update(to_create)
+                    
+                except Exception as e:
+                    session.rollback()
+                    stats['errors'] += 1
+                    logging.error(f"Error processing case {case_id}: {e}")
                 
     finally:
         session.close()
@@ -3,7 +3,7 @@
 PDF Text Extraction Script (Version 3.0 - Trial Batch Support)
 ==============================================================
 Optimized for systems with limited RAM (8GB).
-Caps concurrency and enforces garbage collection.
+Caps concurrency and recycles worker processes to bound memory.
 
 📍 Run from: /home/gusrodgs/Gus/cienciaDeDados/phdMutley
 Command: python scripts/phase1/extract_texts.py
@@ -15,14 +15,15 @@ Version 3.0 Changes:
 
 import sys
 import os
+import io
 import logging
+import logging.handlers
+import multiprocessing
 import concurrent.futures
-import gc
 from pathlib import Path
 from datetime import datetime
-from uuid import uuid5
+from uuid import UUID, uuid4, uuid5
 from tqdm import tqdm
-import pandas as pd
 
 # PDF Libraries
 import pdfplumber
@@ -30,7 +31,7 @@ import fitz  # PyMuPDF
 import PyPDF2
 
 # Database
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, select, bindparam
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.engine import URL
 
@@ -41,7 +42,7 @@ from sqlalchemy.engine import URL
 # Add project root to path to import config
 sys.path.insert(0, '/home/gusrodgs/Gus/cienciaDeDados/phdMutley/scripts')
 from config import (CONFIG, DB_CONFIG, PDF_DOWNLOAD_DIR, UUID_NAMESPACE, 
-                    LOGS_DIR, TRIAL_BATCH_CONFIG, DATABASE_FILE)
+                    LOGS_DIR, TRIAL_BATCH_CONFIG, read_database_excel)
 
 # Import database models
 sys.path.insert(0, os.path.join('/home/gusrodgs/Gus/cienciaDeDados/phdMutley', 'scripts', '0-initialize-database'))
@@ -61,12 +62,34 @@ logging.basicConfig(
     ]
 )
 
+def init_worker_logging(log_queue):
+    """
+    Pool initializer: route worker log records (including pdfminer warnings)
+    to the parent's QueueListener instead of the inherited file handler.
+    """
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+
 # ============================================================================
 # SAFETY SETTINGS
 # ============================================================================
 
 SAFE_WORKERS = 2 
 
+# Extraction results written per transaction by the parent process
+WRITE_BATCH_SIZE = 500
+
+# Recycle each worker process after this many PDFs so memory leaked by the
+# PDF parsers is returned to the OS (requires Python 3.11+). Setting it makes
+# the pool spawn workers, so every recycled worker re-imports this module
+MAX_TASKS_PER_CHILD = 20
+
+# PDFs submitted but not yet collected; keeps workers busy without queuing
+# every task (and its result) up front
+MAX_IN_FLIGHT = SAFE_WORKERS * 4
+
 # ============================================================================
 # TRIAL BATCH FILTERING
 # ============================================================================
@@ -81,10 +104,11 @@ def get_trial_batch_document_ids():
         return None
     
     try:
-        df = pd.read_excel(DATABASE_FILE)
+        col_name = TRIAL_BATCH_CONFIG['COLUMN_NAME']
+        # Only the ID and flag columns are needed to build the filter set
+        df = read_database_excel(columns=['Document ID', col_name])
         logging.info(f"Loaded database with {len(df)} rows for trial batch filtering")
         
-        col_name = TRIAL_BATCH_CONFIG['COLUMN_NAME']
         if col_name not in df.columns:
             logging.error(f"❌ Trial batch column '{col_name}' not found!")
             logging.error("   Proceeding without filtering")
@@ -94,7 +118,8 @@ def get_trial_batch_document_ids():
         trial_batch_df = df[df[col_name].isin(true_values)]
         
         # Extract Document IDs as strings (they're stored in filenames as "doc_{id}.pdf")
-        doc_ids = set(trial_batch_df['Document ID'].astype(str))
+        # Read-only for the whole run; consulted only by the parent's scan
+        doc_ids = frozenset(trial_batch_df['Document ID'].astype(str))
         
         logging.info("="*70)
         logging.info("TRIAL BATCH FILTERING FOR TEXT EXTRACTION")
@@ -191,40 +216,63 @@ def assess_text_quality(text, page_count):
 # EXTRACTION LOGIC
 # ============================================================================
 
+# Quality levels at which the PyMuPDF result is accepted without re-parsing
+ACCEPTED_FAST_QUALITY = {'excellent', 'fair'}
+
+# Postgres text columns reject NUL (0x00), which the PDF parsers can emit,
+# so every backend's output is stripped of it before it reaches a row
 def extract_text_hierarchical(pdf_path):
     path_str = str(pdf_path)
+    fallback = None
     
-    # 1. pdfplumber (Best quality, highest memory usage)
+    # 1. PyMuPDF (Fast, low memory) - enough for text-native PDFs
     try:
-        with pdfplumber.open(path_str) as pdf:
-            text_parts = []
-            for p in pdf.pages:
-                txt = p.extract_text() or ""
-                text_parts.append(txt)
-                
-            full_text = '\n\n'.join(text_parts)
-            del text_parts
-            
+        with fitz.open(path_str) as doc:
+            full_text = '\n\n'.join(page.get_text() for page in doc).replace('\x00', '')
             if full_text.strip():
-                return {'text': full_text, 'pages': len(pdf.pages), 'method': 'pdfplumber', 'success': True}
+                quality = assess_text_quality(full_text, len(doc))
+                result = {'text': full_text, 'pages': len(doc), 'method': 'pymupdf',
+                          'success': True, 'quality': quality}
+                if quality['quality'] in ACCEPTED_FAST_QUALITY:
+                    return result
+                fallback = result
     except Exception:
         pass
 
-    # 2. PyMuPDF (Fast, low memory)
+    # 2. pdfplumber (Best quality, highest memory usage) - only for poor/failed PyMuPDF output
     try:
-        with fitz.open(path_str) as doc:
-            text_parts = [page.get_text() for page in doc]
-            full_text = '\n\n'.join(text_parts)
+        with pdfplumber.open(path_str) as pdf:
+            # Stream pages into a buffer and drop each page's cached objects
+            # as soon as its text is out, instead of holding a list of parts
+            buf = io.StringIO()
+            page_count = 0
+            for p in pdf.pages:
+                try:
+                    if page_count:
+                        buf.write('\n\n')
+                    buf.write(p.extract_text() or "")
+                    page_count += 1
+                finally:
+                    # Release the page's cached chars/objects even on error
+                    p.flush_cache()
+                    p.close()
+                
+            full_text = buf.getvalue().replace('\x00', '')
+            buf.close()
+            
             if full_text.strip():
-                return {'text': full_text, 'pages': len(doc), 'method': 'pymupdf', 'success': True}
+                return {'text': full_text, 'pages': page_count, 'method': 'pdfplumber', 'success': True}
     except Exception:
         pass
 
-    # 3. PyPDF2
+    # Keep the PyMuPDF text if pdfplumber found nothing better
+    if fallback is not None:
+        return fallback
+
+    # 3. PyPDF2 - last resort when neither backend produced text
     try:
         reader = PyPDF2.PdfReader(path_str)
-        text_parts = [p.extract_text() or "" for p in reader.pages]
-        full_text = '\n\n'.join(text_parts)
+        full_text = '\n\n'.join(p.extract_text() or "" for p in reader.pages).replace('\x00', '')
         if full_text.strip():
             return {'text': full_text, 'pages': len(reader.pages), 'method': 'pypdf2', 'success': True}
     except Exception:
@@ -236,108 +284,263 @@ def extract_text_hierarchical(pdf_path):
 # WORKER FUNCTION
 # ============================================================================
 
-def process_single_pdf_safe(pdf_path_str):
+def process_single_pdf_safe(pdf_path_str, doc_uuid_str, file_size_bytes=None):
     """
-    Worker function with aggressive memory cleanup.
+    Worker function. Memory is bounded by recycling workers
+    (MAX_TASKS_PER_CHILD) rather than a gc.collect() per PDF.
+    Pure extraction: returns row mappings for the parent to write in
+    batches, and never touches the database itself.
     """
     pdf_path = Path(pdf_path_str)
-    
-    # Initialize DB connection
-    try:
-        local_engine = create_engine(URL.create(**DB_CONFIG))
-        LocalSession = sessionmaker(bind=local_engine)
-        session = LocalSession()
-    except Exception as e:
-        return {'status': 'db_error', 'file': pdf_path.name, 'error': str(e)}
-
-    result_data = None
 
     try:
-        # 1. Identify
-        doc_id_str = extract_document_id_from_filename(pdf_path.name)
-        if not doc_id_str:
-            return {'status': 'skipped_invalid_name', 'file': pdf_path.name}
+        # 1. Identify (UUID computed once by the parent)
+        doc_uuid = UUID(doc_uuid_str)
 
-        doc_uuid = generate_document_uuid(doc_id_str)
-        
-        # 2. Check DB
-        document = session.query(Document).filter(Document.document_id == doc_uuid).first()
-        if not document:
-            return {'status': 'skipped_not_in_db', 'file': pdf_path.name}
-            
-        if session.query(ExtractedText).filter(ExtractedText.document_id == doc_uuid).first():
-            return {'status': 'skipped_exists', 'file': pdf_path.name}
-
-        # 3. Extract
+        # 2. Extract
         extraction_result = extract_text_hierarchical(pdf_path)
         
         if not extraction_result['success']:
-            extracted = ExtractedText(
-                document_id=doc_uuid,
-                raw_text="",
-                extraction_quality='failed',
-                extraction_date=datetime.now(),
-                extraction_notes="All extraction methods failed"
-            )
-            session.add(extracted)
-            session.commit()
-            return {'status': 'failed', 'file': pdf_path.name}
-
-        # 4. Assess
-        quality = assess_text_quality(extraction_result['text'], extraction_result['pages'])
-
-        # 5. Save
-        document.page_count = extraction_result['pages']
-        document.pdf_file_path = str(pdf_path)
-        document.pdf_downloaded = True
-        try:
-            document.file_size_bytes = pdf_path.stat().st_size
-        except:
-            pass
-
-        extracted = ExtractedText(
-            document_id=doc_uuid,
-            raw_text=extraction_result['text'],
-            processed_text=extraction_result['text'], 
-            word_count=quality['word_count'],
-            character_count=quality['character_count'],
-            extraction_date=datetime.now(),
-            extraction_method=extraction_result['method'],
-            extraction_quality=quality['quality'],
-            extraction_notes=quality['notes']
-        )
-        
-        session.add(extracted)
-        session.commit()
+            return {
+                'status': 'failed',
+                'file': pdf_path.name,
+                'extracted_row': {
+                    'document_id': doc_uuid,
+                    'raw_text': "",
+                    'extraction_quality': 'failed',
+                    'extraction_date': datetime.now(),
+                    'extraction_notes': "All extraction methods failed"
+                }
+            }
+
+        # 3. Assess
+        quality = extraction_result.get('quality') or assess_text_quality(
+            extraction_result['text'], extraction_result['pages'])
+
+        # 4. Build rows
+        # File size comes from the parent's directory scan (no second stat)
+        document_row = {
+            'document_id': doc_uuid,
+            'page_count': extraction_result['pages'],
+            'pdf_file_path': str(pdf_path),
+            'pdf_downloaded': True
+        }
+        if file_size_bytes is not None:
+            document_row['file_size_bytes'] = file_size_bytes
+
+        extracted_row = {
+            'document_id': doc_uuid,
+            'raw_text': extraction_result['text'],
+            'processed_text': extraction_result['text'], 
+            'word_count': quality['word_count'],
+            'character_count': quality['character_count'],
+            'extraction_date': datetime.now(),
+            'extraction_method': extraction_result['method'],
+            'extraction_quality': quality['quality'],
+            'extraction_notes': quality['notes']
+        }
         
-        result_data = {
+        return {
             'status': 'success', 
             'file': pdf_path.name, 
             'method': extraction_result['method'],
-            'quality': quality['quality']
+            'quality': quality['quality'],
+            'extracted_row': extracted_row,
+            'document_row': document_row
         }
-        return result_data
 
     except Exception as e:
-        session.rollback()
         return {'status': 'error', 'file': pdf_path.name, 'error': str(e)}
-        
-    finally:
-        # 6. AGGRESSIVE CLEANUP
-        session.close()
-        local_engine.dispose()
-        
-        # Only delete variables if they were actually created
-        if 'document' in locals(): del document
-        if 'extracted' in locals(): del extracted
-        if 'extraction_result' in locals(): del extraction_result
-        
-        gc.collect()
 
 # ============================================================================
 # MAIN EXECUTION
 # ============================================================================
 
+# Max UUIDs per IN (...) list when checking the database in bulk
+EXISTENCE_CHECK_BATCH = 10000
+
+# Core statements built once; only the ID column is fetched, no ORM entities
+DOCUMENT_IDS_STMT = select(Document.document_id).where(
+    Document.document_id.in_(bindparam('ids', expanding=True)))
+EXTRACTED_IDS_STMT = select(ExtractedText.document_id).where(
+    ExtractedText.document_id.in_(bindparam('ids', expanding=True)))
+
+def fetch_existing_ids(session, stmt, uuids):
+    """Return the subset of uuids matched by stmt, in a few IN-list queries."""
+    found = set()
+    for i in range(0, len(uuids), EXISTENCE_CHECK_BATCH):
+        batch = uuids[i:i + EXISTENCE_CHECK_BATCH]
+        found.update(session.execute(stmt, {'ids': batch}).scalars())
+    return found
+
+def filter_pending_pdfs(pdf_entries, stats):
+    """
+    Resolve each PDF's document UUID once and drop PDFs that cannot or
+    need not be processed before any worker is spawned: invalid names,
+    documents not in the database, and documents that already have
+    extracted text. Two queries replace two per-PDF SELECTs in the workers.
+    
+    pdf_entries may be any iterable of os.DirEntry (e.g. a generator over
+    os.scandir); only path strings, UUIDs and sizes are kept.
+    
+    Returns a list of (path_str, doc_uuid_str, file_size_bytes) worker tasks.
+    """
+    uuid_by_path = {}
+    for entry in pdf_entries:
+        doc_id_str = extract_document_id_from_filename(entry.name)
+        if doc_id_str:
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                size = None
+            uuid_by_path[entry.path] = (generate_document_uuid(doc_id_str), size)
+        else:
+            stats['skipped_invalid'] += 1
+    
+    uuids = [doc_uuid for doc_uuid, _ in uuid_by_path.values()]
+    engine = create_engine(URL.create(**DB_CONFIG))
+    session = sessionmaker(bind=engine)()
+    try:
+        known_docs = fetch_existing_ids(session, DOCUMENT_IDS_STMT, uuids)
+        already_extracted = fetch_existing_ids(session, EXTRACTED_IDS_STMT, uuids)
+    finally:
+        session.close()
+        engine.dispose()
+    
+    pending = []
+    for p, (doc_uuid, size) in uuid_by_path.items():
+        if doc_uuid not in known_docs:
+            stats['skipped_invalid'] += 1
+        elif doc_uuid in already_extracted:
+            stats['skipped_exists'] += 1
+        else:
+            pending.append((p, str(doc_uuid), size))
+    
+    logging.info(f"Already extracted: {stats['skipped_exists']} | "
+                 f"Invalid/not in DB: {stats['skipped_invalid']} | Pending: {len(pending)}")
+    return pending
+
+def iter_completed(executor, fn, args_iter, max_in_flight):
+    """
+    Submit fn(*args) for each args tuple keeping at most max_in_flight
+    tasks pending, and yield results in completion order (a slow PDF no longer blocks the
+    results behind it).
+    """
+    pending = set()
+    for args in args_iter:
+        pending.add(executor.submit(fn, *args))
+        if len(pending) >= max_in_flight:
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for fut in done:
+                yield fut.result()
+    for fut in concurrent.futures.as_completed(pending):
+        yield fut.result()
+
+# extracted_text columns streamed by COPY. text_id and the timestamps have
+# Python-side defaults only, so they are filled in here
+EXTRACTED_TEXT_COPY_COLUMNS = (
+    'text_id', 'document_id', 'raw_text', 'processed_text', 'word_count',
+    'character_count', 'extraction_date', 'extraction_method',
+    'extraction_quality', 'extraction_notes', 'created_at', 'updated_at'
+)
+EXTRACTED_TEXT_COPY_SQL = (
+    f"COPY {ExtractedText.__tablename__} ({', '.join(EXTRACTED_TEXT_COPY_COLUMNS)}) "
+    "FROM STDIN WITH (FORMAT CSV)"
+)
+
+def csv_field(value):
+    """CSV field for COPY: unquoted empty is NULL, anything else is quoted."""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return '"' + str(value).replace('"', '""') + '"'
+
+def copy_extracted_rows(session, extracted_rows):
+    """
+    Stream extracted_text rows into Postgres with COPY FROM STDIN on the
+    session's own connection, so the load commits with the batch.
+    """
+    now = datetime.utcnow()
+    buffer = io.StringIO()
+    for row in extracted_rows:
+        record = dict(row, text_id=uuid4(), created_at=now, updated_at=now)
+        buffer.write(','.join(csv_field(record.get(col)) for col in EXTRACTED_TEXT_COPY_COLUMNS))
+        buffer.write('\n')
+    buffer.seek(0)
+    
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(EXTRACTED_TEXT_COPY_SQL, buffer)
+    finally:
+        cursor.close()
+
+def write_rows_individually(session, extracted_rows, document_rows, stats):
+    """
+    Fallback for a failed batch: write each document under its own
+    SAVEPOINT so one bad row no longer takes the rest of the batch with it.
+    Rows that still fail are moved from the count record_result gave them
+    to 'errors' (worker-failed rows are the ones with quality 'failed').
+    """
+    documents = {row['document_id']: row for row in document_rows}
+    for row in extracted_rows:
+        document_row = documents.pop(row['document_id'], None)
+        try:
+            with session.begin_nested():
+                copy_extracted_rows(session, [row])
+                if document_row is not None:
+                    session.bulk_update_mappings(Document, [document_row])
+        except Exception as e:
+            counted_as = 'failed' if row.get('extraction_quality') == 'failed' else 'success'
+            stats[counted_as] -= 1
+            stats['errors'] += 1
+            logging.error(f"Error writing result for {row['document_id']}: {e}")
+    
+    for document_id, document_row in documents.items():
+        try:
+            with session.begin_nested():
+                session.bulk_update_mappings(Document, [document_row])
+        except Exception as e:
+            logging.error(f"Error updating document {document_id}: {e}")
+    session.commit()
+
+def flush_results(session, extracted_rows, document_rows, stats):
+    """
+    Write one batch of worker results in a single transaction, falling back
+    to per-document writes if the batch fails.
+    """
+    if not extracted_rows and not document_rows:
+        return
+    try:
+        try:
+            if extracted_rows:
+                copy_extracted_rows(session, extracted_rows)
+            if document_rows:
+                session.bulk_update_mappings(Document, document_rows)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logging.warning(f"Batch of {len(extracted_rows)} results failed ({e}); "
+                            f"retrying one document at a time")
+            write_rows_individually(session, extracted_rows, document_rows, stats)
+    except Exception as e:
+        session.rollback()
+        logging.error(f"Error writing batch of {len(extracted_rows)} results: {e}")
+    finally:
+        extracted_rows.clear()
+        document_rows.clear()
+
+def record_result(stats, res):
+    status = res['status']
+    if status == 'success': stats['success'] += 1
+    elif status == 'skipped_exists': stats['skipped_exists'] += 1
+    elif status in ['skipped_invalid_name', 'skipped_not_in_db']: stats['skipped_invalid'] += 1
+    elif status == 'failed': stats['failed'] += 1
+    else: 
+        stats['errors'] += 1
+        logging.error(f"Error: {res.get('error')}")
+
 def process_all_pdfs():
     logging.info("="*70)
     logging.info(f"PDF TEXT EXTRACTION (SAFE MODE) - Workers: {SAFE_WORKERS}")
@@ -350,49 +553,79 @@ def process_all_pdfs():
     # Get trial batch filter
     trial_batch_ids = get_trial_batch_document_ids()
     
-    # Get all PDF files
-    all_pdf_files = list(PDF_DOWNLOAD_DIR.glob('*.pdf'))
-    logging.info(f"Found {len(all_pdf_files)} PDF files in download directory")
+    stats = {
+        'success': 0, 'failed': 0, 'skipped_exists': 0, 
+        'skipped_invalid': 0, 'errors': 0
+    }
+    counts = {'found': 0, 'selected': 0}
     
-    # Filter by trial batch if enabled
+    # The trial batch filter runs here, before dispatch: workers only receive
+    # (path, uuid, size) tuples and never need the ID set pickled to them
+    def candidate_pdfs():
+        """Stream PDF directory entries through the trial batch filter without building lists."""
+        with os.scandir(PDF_DOWNLOAD_DIR) as it:
+            for entry in it:
+                if not entry.name.endswith('.pdf') or not entry.is_file():
+                    continue
+                counts['found'] += 1
+                if should_process_pdf(entry.name, trial_batch_ids):
+                    counts['selected'] += 1
+                    yield entry
+    
+    tasks = filter_pending_pdfs(candidate_pdfs(), stats)
+    
+    logging.info(f"Found {counts['found']} PDF files in download directory")
     if trial_batch_ids is not None:
-        pdf_files = [f for f in all_pdf_files if should_process_pdf(f.name, trial_batch_ids)]
-        excluded = len(all_pdf_files) - len(pdf_files)
-        logging.info(f"After trial batch filter: {len(pdf_files)} files to process ({excluded} excluded)")
-    else:
-        pdf_files = all_pdf_files
+        excluded = counts['found'] - counts['selected']
+        logging.info(f"After trial batch filter: {counts['selected']} files to process ({excluded} excluded)")
 
-    if len(pdf_files) == 0:
+    if counts['selected'] == 0:
         logging.error("❌ No PDF files to process!")
         return
 
-    logging.info(f"Processing {len(pdf_files)} files...")
-
-    stats = {
-        'success': 0, 'failed': 0, 'skipped_exists': 0, 
-        'skipped_invalid': 0, 'errors': 0
-    }
+    logging.info(f"Processing {len(tasks)} files...")
+    
+    # Single writer: workers only extract, the parent batches all DB writes
+    engine = create_engine(URL.create(**DB_CONFIG))
+    session = sessionmaker(bind=engine)()
+    extracted_rows, document_rows = [], []
     
-    # Use limited workers
-    with concurrent.futures.ProcessPoolExecutor(max_workers=SAFE_WORKERS) as executor:
-        path_strings = [str(p) for p in pdf_files]
+    # Only the parent writes log output; workers enqueue records. The queue
+    # must come from the spawn context the pool uses (MAX_TASKS_PER_CHILD)
+    mp_context = multiprocessing.get_context('spawn')
+    log_queue = mp_context.Queue(-1)
+    log_listener = logging.handlers.QueueListener(
+        log_queue, *logging.getLogger().handlers, respect_handler_level=True
+    )
+    log_listener.start()
+    
+    try:
+        # Use limited workers
+        with concurrent.futures.ProcessPoolExecutor(max_workers=SAFE_WORKERS,
+                                                    mp_context=mp_context,
+                                                    max_tasks_per_child=MAX_TASKS_PER_CHILD,
+                                                    initializer=init_worker_logging,
+                                                    initargs=(log_queue,)) as executor:
+            # Aggregate as results complete instead of keeping a results list
+            for res in tqdm(
+                iter_completed(executor, process_single_pdf_safe, tasks, MAX_IN_FLIGHT),
+                total=len(tasks),
+                desc="Extracting (MemSafe)"
+            ):
+                if 'extracted_row' in res:
+                    extracted_rows.append(res.pop('extracted_row'))
+                if 'document_row' in res:
+                    document_rows.append(res.pop('document_row'))
+                record_result(stats, res)
+                
+                if len(extracted_rows) >= WRITE_BATCH_SIZE:
+                    flush_results(session, extracted_rows, document_rows, stats)
         
-        results = list(tqdm(
-            executor.map(process_single_pdf_safe, path_strings), 
-            total=len(path_strings),
-            desc="Extracting (MemSafe)"
-        ))
-
-    # Results
-    for res in results:
-        status = res['status']
-        if status == 'success': stats['success'] += 1
-        elif status == 'skipped_exists': stats['skipped_exists'] += 1
-        elif status in ['skipped_invalid_name', 'skipped_not_in_db']: stats['skipped_invalid'] += 1
-        elif status == 'failed': stats['failed'] += 1
-        else: 
-            stats['errors'] += 1
-            logging.error(f"Error: {res.get('error')}")
+        flush_results(session, extracted_rows, document_rows, stats)
+    finally:
+        log_listener.stop()
+        session.close()
+        engine.dispose()
 
     logging.info("\n" + "="*70)
     logging.info("EXTRACTION SUMMARY")
@@ -404,7 +637,7 @@ def process_all_pdfs():
     
     if TRIAL_BATCH_CONFIG['ENABLED']:
         logging.info(f"\n✓ Trial batch mode was ENABLED")
-        logging.info(f"  Processed {len(pdf_files)} out of {len(all_pdf_files)} total PDFs")
+        logging.info(f"  Processed {counts['selected']} out of {counts['found']} total PDFs")
     
     logging.info("="*70)
 
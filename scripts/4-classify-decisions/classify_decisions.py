@@ -57,7 +57,7 @@ from sqlalchemy.engine import URL
 
 sys.path.insert(0, '/home/gusrodgs/Gus/cienciaDeDados/phdMutley/scripts')
 from config import (CONFIG, DB_CONFIG, LOGS_DIR, TRIAL_BATCH_CONFIG, 
-                    DATABASE_FILE, UUID_NAMESPACE)
+                    UUID_NAMESPACE, read_database_excel)
 
 sys.path.insert(0, os.path.join('/home/gusrodgs/Gus/cienciaDeDados/phdMutley', 'scripts', '0-initialize-database'))
 from init_database import Document, ExtractedText
@@ -109,10 +109,11 @@ def get_trial_batch_document_uuids():
         return None
     
     try:
-        df = pd.read_excel(DATABASE_FILE)
+        col_name = TRIAL_BATCH_CONFIG['COLUMN_NAME']
+        # Only the ID and flag columns are needed to build the filter set
+        df = read_database_excel(columns=['Document ID', col_name])
         logging.info(f"Loaded database with {len(df)} rows for trial batch filtering")
         
-        col_name = TRIAL_BATCH_CONFIG['COLUMN_NAME']
         if col_name not in df.columns:
             logging.error(f"❌ Trial batch column '{col_name}' not found!")
             logging.error("   Proceeding without filtering")
@@ -122,11 +123,10 @@ def get_trial_batch_document_uuids():
         trial_batch_df = df[df[col_name].isin(true_values)]
         
         # Convert Document IDs to UUIDs using same method as populate_metadata
-        def generate_document_uuid(document_id_str):
-            clean_id = str(document_id_str).strip().lower()
-            return uuid5(UUID_NAMESPACE, f"document_{clean_id}")
-        
-        doc_uuids = set(trial_batch_df['Document ID'].apply(generate_document_uuid))
+        doc_uuids = {
+            uuid5(UUID_NAMESPACE, f"document_{str(x).strip().lower()}")
+            for x in trial_batch_df['Document ID'].to_numpy()
+        }
         
         logging.info("="*70)
         logging.info("TRIAL BATCH FILTERING FOR DECISION CLASSIFICATION")
@@ -159,7 +159,7 @@ def load_document_titles_mapping():
     OUTPUT: Dictionary mapping UUID to Document Title string
     """
     try:
-        df = pd.read_excel(DATABASE_FILE)
+        df = read_database_excel(columns=['Document ID', 'Document Title'])
         
         if 'Document ID' not in df.columns or 'Document Title' not in df.columns:
             logging.error("❌ Required columns not found in Excel!")
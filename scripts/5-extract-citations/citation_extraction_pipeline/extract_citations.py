@@ -64,7 +64,7 @@ import uuid
 
 sys.path.insert(0, '/home/gusrodgs/Gus/cienciaDeDados/phdMutley')
 from config import (CONFIG, DB_CONFIG, LOGS_DIR, TRIAL_BATCH_CONFIG, 
-                    DATABASE_FILE, UUID_NAMESPACE, get_binding_courts)
+                    DATABASE_FILE, UUID_NAMESPACE)
 
 sys.path.insert(0, os.path.join('/home/gusrodgs/Gus/cienciaDeDados/phdMutley', 'scripts', 'phase0'))
 from init_database import Case, Document, ExtractedText
@@ -375,6 +375,18 @@ JURISDICTION_ALIASES = {
     "Aotearoa": "New Zealand",
 }
 
+# ============================================================================
+# GLOBAL NORTH COUNTRIES - FOR REGION CLASSIFICATION
+# ============================================================================
+
+GLOBAL_NORTH_COUNTRIES = frozenset({
+    "United States", "United Kingdom", "Canada", "Australia", "New Zealand",
+    "Germany", "France", "Netherlands", "Belgium", "Switzerland", "Austria",
+    "Sweden", "Norway", "Denmark", "Finland", "Iceland", "Ireland", "Italy",
+    "Spain", "Portugal", "Greece", "Japan", "South Korea", "Singapore",
+    "European Union", "Council of Europe"
+})
+
 # ============================================================================
 # GLOBAL CACHES
 # ============================================================================
@@ -612,9 +624,9 @@ def get_source_region(country: str) -> str:
     
     INPUT: Country name
     ALGORITHM:
-        1. Use get_binding_courts() from config.py
-        2. Check if country is in Global North or South lists
-        3. Return classification
+        1. Check if international
+        2. Check against GLOBAL_NORTH_COUNTRIES list
+        3. Default to Global South
     OUTPUT: "Global North" | "Global South" | "International" | "Unknown"
     """
     if country == "International":
@@ -623,21 +635,6 @@ def get_source_region(country: str) -> str:
     if not country or country == "Unknown":
         return "Unknown"
     
-    # Get binding courts configuration (contains region mapping)
-    binding_courts = get_binding_courts(country, "Unknown")
-    
-    # Simple heuristic: if binding_courts includes ICJ/ITLOS, likely International
-    # Otherwise, use Maria Tigre's definition from config.py
-    # For now, we'll use a simplified mapping
-    
-    GLOBAL_NORTH_COUNTRIES = {
-        "United States", "United Kingdom", "Canada", "Australia", "New Zealand",
-        "Germany", "France", "Netherlands", "Belgium", "Switzerland", "Austria",
-        "Sweden", "Norway", "Denmark", "Finland", "Iceland", "Ireland", "Italy",
-        "Spain", "Portugal", "Greece", "Japan", "South Korea", "Singapore",
-        "European Union", "Council of Europe"
-    }
-    
     if country in GLOBAL_NORTH_COUNTRIES:
         return "Global North"
     else:
@@ -53,17 +53,58 @@ Date: November 25, 2025
 import sys
 import os
 import time
+import io
 import json
 import logging
+import logging.handlers
 import re
+import random
+import asyncio
+import hashlib
+import sqlite3
+import tempfile
+import threading
+import multiprocessing
+import concurrent.futures
+from collections import Counter, OrderedDict
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Set
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Set
 import anthropic
+import httpx
+
+# Optional: HTTP/2 support for httpx (pip install h2)
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Optional: faster JSON decoding for LLM responses (pip install orjson)
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# Optional: C Aho-Corasick automaton for dictionary matching (pip install pyahocorasick)
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Optional: sentence embeddings for the Tier 2 semantic cache (pip install sentence-transformers)
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
 
 # Database
-from sqlalchemy import create_engine, Column, String, Integer, Boolean, Text, DECIMAL, TIMESTAMP, ForeignKey
+from sqlalchemy import create_engine, exists, Column, String, Integer, Boolean, Text, DECIMAL, TIMESTAMP, ForeignKey
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.engine import URL
 from sqlalchemy.dialects.postgresql import UUID as pgUUID
@@ -75,7 +116,8 @@ import uuid
 
 sys.path.insert(0, '/home/gusrodgs/Gus/cienciaDeDados/phdMutley/scripts')
 from config import (CONFIG, DB_CONFIG, LOGS_DIR, TRIAL_BATCH_CONFIG, 
-                    DATABASE_FILE, UUID_NAMESPACE, get_binding_courts)
+                    UUID_NAMESPACE, read_database_excel,
+                    LLM_CACHE_FILE)
 
 sys.path.insert(0, os.path.join('/home/gusrodgs/Gus/cienciaDeDados/phdMutley', 'scripts', '0-initialize-database'))
 from init_database import Case, Document, ExtractedText
@@ -111,7 +153,303 @@ if not CONFIG['ANTHROPIC_API_KEY']:
     logging.error("CRITICAL: ANTHROPIC_API_KEY not found.")
     sys.exit(1)
 
-client = anthropic.Anthropic(api_key=CONFIG['ANTHROPIC_API_KEY'])
+# One pooled keep-alive connection set for every API call in the run
+API_TIMEOUT_SECONDS = 600.0  # long Phase 2A completions (16k output tokens)
+API_MAX_RETRIES = 4  # SDK retries 429/5xx with exponential backoff + jitter
+
+# Second layer for what the SDK gives up on or cannot retry (sustained 429s,
+# overloaded errors raised mid-stream): whole-request retries with full jitter
+LLM_RETRY_ATTEMPTS = 3
+LLM_RETRY_BASE_SECONDS = 2.0
+LLM_RETRY_MAX_SECONDS = 60.0
+
+# Shared by the sync client and any async client used for concurrent calls
+HTTP_POOL_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+
+http_client = httpx.Client(
+    http2=HTTP2_AVAILABLE,
+    limits=HTTP_POOL_LIMITS,
+    timeout=API_TIMEOUT_SECONDS
+)
+client = anthropic.Anthropic(
+    api_key=CONFIG['ANTHROPIC_API_KEY'],
+    http_client=http_client,
+    max_retries=API_MAX_RETRIES
+)
+
+# ============================================================================
+# PERSISTENT LLM RESPONSE CACHE
+# ============================================================================
+
+# Responses keyed by sha256(model, max_tokens, prompt) in a SQLite file, so
+# re-runs and repeated citations across documents skip the API call.
+# One connection shared by the document threads, serialized by the lock.
+_LLM_CACHE_CONN: Optional[sqlite3.Connection] = None
+_LLM_CACHE_LOCK = threading.Lock()
+
+def get_llm_cache() -> sqlite3.Connection:
+    """Open (once) the SQLite response cache at LLM_CACHE_FILE."""
+    global _LLM_CACHE_CONN
+    if _LLM_CACHE_CONN is None:
+        # timeout: --processes workers share the file and may wait on a writer
+        _LLM_CACHE_CONN = sqlite3.connect(str(LLM_CACHE_FILE), check_same_thread=False, timeout=30)
+        _LLM_CACHE_CONN.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            " cache_key TEXT PRIMARY KEY,"
+            " model TEXT,"
+            " response_text TEXT,"
+            " input_tokens INTEGER,"
+            " output_tokens INTEGER,"
+            " created_at TEXT)"
+        )
+        # Confident Phase 3 origins by normalized case name (see cache_origin)
+        _LLM_CACHE_CONN.execute(
+            "CREATE TABLE IF NOT EXISTS citation_origins ("
+            " cache_key TEXT PRIMARY KEY,"
+            " origin_json TEXT,"
+            " created_at TEXT)"
+        )
+    return _LLM_CACHE_CONN
+
+def llm_cache_key(model: str, max_tokens: int, prompt: str, prefix: str = "") -> str:
+    return hashlib.sha256(
+        f"{model}\x00{max_tokens}\x00{prefix}\x00{prompt}".encode('utf-8')
+    ).hexdigest()
+
+def build_message_content(prompt: str, prefix: str = ""):
+    """
+    User message content. A static instruction prefix goes in its own block
+    marked for Anthropic prompt caching, so repeated calls reuse it.
+    """
+    if not prefix:
+        return prompt
+    return [
+        {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": prompt}
+    ]
+
+def call_claude_cached(model: str, max_tokens: int, prompt: str,
+                       prefix: str = "", stream: bool = False) -> Tuple[str, Dict]:
+    """
+    Single-turn Claude call (temperature 0) backed by the persistent cache.
+    
+    INPUT: model, max_tokens, user prompt, optional static prefix
+           (sent first, as a prompt-cached block), stream (receive the
+           response incrementally - for long generations)
+    ALGORITHM:
+        1. Look up sha256 key in the SQLite cache
+        2. On miss, call the API; if the reply hit max_tokens, retry once
+           with double the budget (capped at MAX_OUTPUT_TOKENS)
+        3. Store the response text
+    OUTPUT: (response_text, usage) where usage has input_tokens,
+            output_tokens (0 on cache hits - nothing was billed),
+            cache_read/cache_write prompt-cache tokens and cached
+    """
+    key = llm_cache_key(model, max_tokens, prompt, prefix)
+    cached = get_cached_response(key)
+    if cached is not None:
+        return cached
+    
+    params = build_request_params(model, max_tokens, prompt, prefix)
+    message = send_message(params, stream)
+    usage = message_usage(message)
+    
+    # Budgets are sized to typical outputs; a truncated reply gets one retry
+    retry_tokens = truncation_retry_tokens(message, max_tokens)
+    if retry_tokens:
+        message = send_message(dict(params, max_tokens=retry_tokens), stream)
+        merge_usage(usage, message_usage(message))
+    
+    response_text = message.content[0].text
+    store_cached_response(key, model, response_text, usage)
+    return response_text, usage
+
+def is_retryable_api_error(error: Exception) -> bool:
+    """Throttling, overload, server and connection errors are worth retrying."""
+    if isinstance(error, (anthropic.APIConnectionError, anthropic.RateLimitError,
+                          anthropic.InternalServerError)):
+        return True
+    status = getattr(error, 'status_code', None)
+    return status is not None and (status in (408, 409, 429) or status >= 500)
+
+def retry_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform in [0, base * 2^attempt], capped."""
+    return random.uniform(0, min(LLM_RETRY_MAX_SECONDS, LLM_RETRY_BASE_SECONDS * 2 ** attempt))
+
+def send_message(params: Dict, stream: bool = False):
+    """
+    One API request, retried up to LLM_RETRY_ATTEMPTS more times on
+    transient errors, so throttling does not fail the whole document.
+    """
+    for attempt in range(LLM_RETRY_ATTEMPTS + 1):
+        try:
+            if stream:
+                # Tokens arrive as they are generated, so multi-minute completions
+                # never sit on an idle connection waiting for one large body
+                with client.messages.stream(**params) as response_stream:
+                    return response_stream.get_final_message()
+            return client.messages.create(**params)
+        except anthropic.APIError as e:
+            if attempt == LLM_RETRY_ATTEMPTS or not is_retryable_api_error(e):
+                raise
+            delay = retry_delay(attempt)
+            logging.warning(f"⚠️  API error ({e.__class__.__name__}), retry {attempt + 1}/{LLM_RETRY_ATTEMPTS} in {delay:.1f}s")
+            time.sleep(delay)
+
+def truncation_retry_tokens(message, max_tokens: int) -> Optional[int]:
+    """Doubled budget (capped) when a reply stopped at max_tokens, else None."""
+    if message.stop_reason != "max_tokens" or max_tokens >= MAX_OUTPUT_TOKENS:
+        return None
+    retry_tokens = min(max_tokens * 2, MAX_OUTPUT_TOKENS)
+    logging.info(f"  Response hit max_tokens={max_tokens}, retrying with {retry_tokens}")
+    return retry_tokens
+
+def merge_usage(usage: Dict, retry_usage: Dict):
+    for field in ('input_tokens', 'output_tokens', 'cache_read_tokens', 'cache_write_tokens'):
+        usage[field] += retry_usage[field]
+
+def build_request_params(model: str, max_tokens: int, prompt: str, prefix: str = "") -> Dict:
+    """Messages API parameters shared by direct calls and batch requests."""
+    return {
+        'model': model,
+        'max_tokens': max_tokens,
+        'temperature': 0.0,
+        'messages': [{"role": "user", "content": build_message_content(prompt, prefix)}]
+    }
+
+def message_usage(message) -> Dict:
+    return {
+        'input_tokens': message.usage.input_tokens,
+        'output_tokens': message.usage.output_tokens,
+        'cache_read_tokens': getattr(message.usage, 'cache_read_input_tokens', None) or 0,
+        'cache_write_tokens': getattr(message.usage, 'cache_creation_input_tokens', None) or 0,
+        'cached': False
+    }
+
+def get_cached_response(key: str) -> Optional[Tuple[str, Dict]]:
+    """(response_text, usage) from the SQLite cache, or None on a miss."""
+    with _LLM_CACHE_LOCK:
+        row = get_llm_cache().execute(
+            "SELECT response_text FROM llm_responses WHERE cache_key = ?", (key,)
+        ).fetchone()
+    if row is None:
+        return None
+    return row[0], {'input_tokens': 0, 'output_tokens': 0,
+                    'cache_read_tokens': 0, 'cache_write_tokens': 0, 'cached': True}
+
+def is_response_cached(key: str) -> bool:
+    with _LLM_CACHE_LOCK:
+        return get_llm_cache().execute(
+            "SELECT 1 FROM llm_responses WHERE cache_key = ?", (key,)
+        ).fetchone() is not None
+
+def store_cached_response(key: str, model: str, response_text: str, usage: Dict):
+    with _LLM_CACHE_LOCK:
+        cache = get_llm_cache()
+        cache.execute(
+            "INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?, ?, ?)",
+            (key, model, response_text, usage['input_tokens'], usage['output_tokens'],
+             datetime.utcnow().isoformat())
+        )
+        cache.commit()
+
+# ============================================================================
+# CONCURRENT LLM CALLS (ASYNC FAN-OUT)
+# ============================================================================
+
+# Max requests in flight when several independent prompts are sent at once
+LLM_CONCURRENCY = 16
+
+async def send_message_async(async_client, params: Dict, semaphore):
+    """Async send_message: same transient-error retries, backing off outside the semaphore."""
+    for attempt in range(LLM_RETRY_ATTEMPTS + 1):
+        try:
+            async with semaphore:  # Limits active requests to LLM_CONCURRENCY
+                return await async_client.messages.create(**params)
+        except anthropic.APIError as e:
+            if attempt == LLM_RETRY_ATTEMPTS or not is_retryable_api_error(e):
+                raise
+            delay = retry_delay(attempt)
+            logging.warning(f"⚠️  API error ({e.__class__.__name__}), retry {attempt + 1}/{LLM_RETRY_ATTEMPTS} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+async def request_claude_async(async_client, params: Dict, semaphore) -> Tuple[str, Dict]:
+    """One uncached call on the async client, with the truncation retry."""
+    message = await send_message_async(async_client, params, semaphore)
+    usage = message_usage(message)
+    retry_tokens = truncation_retry_tokens(message, params['max_tokens'])
+    if retry_tokens:
+        message = await send_message_async(async_client, dict(params, max_tokens=retry_tokens), semaphore)
+        merge_usage(usage, message_usage(message))
+    return message.content[0].text, usage
+
+# One AsyncAnthropic client for the whole run, living on a background event
+# loop so its keep-alive / HTTP/2 connections survive between fan-outs
+# (asyncio.run per call would open and tear down a fresh pool every time)
+_ASYNC_RUNTIME = None
+_ASYNC_RUNTIME_LOCK = threading.Lock()
+
+def get_async_runtime():
+    """
+    Lazily start the shared event loop thread and its pooled async client.
+    
+    OUTPUT: (loop, async_client, semaphore); the semaphore bounds requests
+            in flight across every caller, not per fan-out
+    """
+    global _ASYNC_RUNTIME
+    with _ASYNC_RUNTIME_LOCK:
+        if _ASYNC_RUNTIME is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='llm-async', daemon=True).start()
+            async_client = anthropic.AsyncAnthropic(
+                api_key=CONFIG['ANTHROPIC_API_KEY'],
+                http_client=httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=HTTP_POOL_LIMITS,
+                                              timeout=API_TIMEOUT_SECONDS),
+                max_retries=API_MAX_RETRIES
+            )
+            _ASYNC_RUNTIME = (loop, async_client, asyncio.Semaphore(LLM_CONCURRENCY))
+        return _ASYNC_RUNTIME
+
+async def request_claude_many_async(async_client, semaphore, params_list: List[Dict]) -> List:
+    """
+    Main async orchestrator: semaphore-bounded gather on the shared client.
+    Failed requests come back as exceptions in place.
+    """
+    tasks = [request_claude_async(async_client, params, semaphore) for params in params_list]
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+def call_claude_cached_many(model: str, requests: List[Tuple[int, str]],
+                            prefix: str = "") -> List[Optional[Tuple[str, Dict]]]:
+    """
+    Concurrent counterpart of call_claude_cached for independent prompts.
+    
+    INPUT: model, list of (max_tokens, prompt), shared static prefix
+    ALGORITHM:
+        1. Look up every request in the SQLite cache (this thread)
+        2. Send only the misses concurrently on the shared async client
+           (background event loop, LLM_CONCURRENCY)
+        3. Store successful responses in the cache (this thread)
+    OUTPUT: (response_text, usage) per request, in order; None on failure
+    """
+    keys = [llm_cache_key(model, max_tokens, prompt, prefix) for max_tokens, prompt in requests]
+    results = [get_cached_response(key) for key in keys]
+    
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        params_list = [build_request_params(model, requests[i][0], requests[i][1], prefix)
+                       for i in missing]
+        loop, async_client, semaphore = get_async_runtime()
+        responses = asyncio.run_coroutine_threadsafe(
+            request_claude_many_async(async_client, semaphore, params_list), loop
+        ).result()
+        for i, response in zip(missing, responses):
+            if isinstance(response, Exception):
+                logging.error(f"LLM request failed: {response}")
+                continue
+            store_cached_response(keys[i], model, *response)
+            results[i] = response
+    
+    return results
 
 # ============================================================================
 # PROCESSING CONFIGURATION
@@ -128,9 +466,20 @@ SAFE_CHAR_THRESHOLD = SAFE_TOKEN_THRESHOLD * CHARS_PER_TOKEN  # ~600K chars
 # Model maximum output tokens (Sonnet 4.5 supports up to 16,384)
 MAX_OUTPUT_TOKENS = 16384
 
+# Phase 2A output budget scales with the text instead of always reserving
+# the maximum (truncated replies are retried with double the budget)
+EXTRACTION_BASE_OUTPUT_TOKENS = 1024
+EXTRACTION_CHARS_PER_OUTPUT_TOKEN = 20
+
 # Overlap for chunking (to avoid missing citations at chunk boundaries)
 CHUNK_OVERLAP_CHARS = 5000
 
+# Chunks of one long document extracted at the same time
+CHUNK_CONCURRENCY = 4
+
+# Markdown code fences around LLM JSON responses
+MARKDOWN_FENCE_PATTERN = re.compile(r'```json\s*|\s*```')
+
 # ============================================================================
 # ENHANCED DICTIONARIES - KNOWN FOREIGN COURTS
 # ============================================================================
@@ -285,6 +634,118 @@ LANDMARK_CLIMATE_CASES = {
                         "court": "High Court of South Africa"},
 }
 
+# ============================================================================
+# DICTIONARY MATCHING AUTOMATA
+# ============================================================================
+
+def build_pattern_automaton(patterns: Dict[str, Dict]):
+    """
+    Compile dictionary keys into one Aho-Corasick automaton (casefolded).
+    
+    INPUT: KNOWN_FOREIGN_COURTS / LANDMARK_CLIMATE_CASES style dict
+    ALGORITHM: Store (priority, key, data) per casefolded key, where priority
+               is the key's position in the dict (first listed wins)
+    OUTPUT: ahocorasick.Automaton, or None if pyahocorasick is unavailable
+    """
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for priority, (key, data) in enumerate(patterns.items()):
+        automaton.add_word(key.casefold(), (priority, key, data))
+    automaton.make_automaton()
+    return automaton
+
+COURT_AUTOMATON = build_pattern_automaton(KNOWN_FOREIGN_COURTS)
+CASE_AUTOMATON = build_pattern_automaton(LANDMARK_CLIMATE_CASES)
+
+# Casefolded key -> (original key, data), built once (dict order preserved)
+# for case-insensitive membership tests and the no-automaton fallback
+KNOWN_FOREIGN_COURTS_CF = {key.casefold(): (key, data) for key, data in KNOWN_FOREIGN_COURTS.items()}
+LANDMARK_CLIMATE_CASES_CF = {key.casefold(): (key, data) for key, data in LANDMARK_CLIMATE_CASES.items()}
+
+def scan_courts(text_folded: str):
+    """Yield (end_index, (court_key, court_data)) for every court name in text_folded."""
+    if COURT_AUTOMATON is None:
+        for key_folded, hit in KNOWN_FOREIGN_COURTS_CF.items():
+            start = text_folded.find(key_folded)
+            while start != -1:
+                yield start + len(key_folded) - 1, hit
+                start = text_folded.find(key_folded, start + 1)
+        return
+    for end_index, (_, key, data) in COURT_AUTOMATON.iter(text_folded):
+        yield end_index, (key, data)
+
+def first_pattern_match(automaton, patterns_folded: Dict[str, Tuple[str, Dict]],
+                        *texts_folded: str) -> Optional[Tuple[str, Dict]]:
+    """
+    Return the first-listed (key, data) whose key occurs in any of the
+    casefolded texts, matching the order of a plain dict iteration.
+    
+    INPUT: automaton from build_pattern_automaton (or None), the matching
+           *_CF dict, casefolded texts
+    ALGORITHM: One automaton pass per text; keep the lowest-priority hit
+    OUTPUT: (key, data) or None
+    """
+    if automaton is None:
+        for key_folded, hit in patterns_folded.items():
+            if any(key_folded in t for t in texts_folded):
+                return hit
+        return None
+    
+    best = None
+    for text_folded in texts_folded:
+        for _, hit in automaton.iter(text_folded):
+            if best is None or hit[0] < best[0]:
+                best = hit
+    return (best[1], best[2]) if best else None
+
+# ============================================================================
+# REPORTER SIGNATURES - TIER 0 CITATION FORMAT PREFILTER
+# ============================================================================
+
+# (pattern, country, region, court): citation formats that identify the
+# issuing court on their own, so no dictionary or LLM lookup is needed
+REPORTER_SIGNATURES = [
+    # UNITED STATES
+    (r"\b\d+\s+U\.\s?S\.\s+\d+", "United States", "Global North", "U.S. Supreme Court"),
+    (r"\b\d+\s+S\.\s?Ct\.\s+\d+", "United States", "Global North", "U.S. Supreme Court"),
+    (r"\b\d+\s+F\.\s?(?:2d|3d|4th)\s+\d+", "United States", "Global North", "U.S. Court of Appeals"),
+    (r"\b\d+\s+F\.\s?Supp\.\s?(?:2d|3d)?\s+\d+", "United States", "Global North", "U.S. District Court"),
+    
+    # UNITED KINGDOM (neutral citations)
+    (r"\[\d{4}\]\s+UKSC\s+\d+", "United Kingdom", "Global North", "UK Supreme Court"),
+    (r"\[\d{4}\]\s+UKHL\s+\d+", "United Kingdom", "Global North", "House of Lords"),
+    (r"\[\d{4}\]\s+EWCA\s+(?:Civ|Crim)\s+\d+", "United Kingdom", "Global North", "Court of Appeal (England and Wales)"),
+    (r"\[\d{4}\]\s+EWHC\s+\d+", "United Kingdom", "Global North", "High Court of England and Wales"),
+    (r"\[\d{4}\]\s+CSIH\s+\d+", "Scotland", "Global North", "Inner House"),
+    (r"\[\d{4}\]\s+CSOH\s+\d+", "Scotland", "Global North", "Outer House"),
+    
+    # COMMONWEALTH
+    (r"\[\d{4}\]\s+HCA\s+\d+", "Australia", "Global North", "High Court of Australia"),
+    (r"\(\d{4}\)\s+\d+\s+CLR\s+\d+", "Australia", "Global North", "High Court of Australia"),
+    (r"\[\d{4}\]\s+NZSC\s+\d+", "New Zealand", "Global North", "Supreme Court of New Zealand"),
+    (r"\[\d{4}\]\s+NZCA\s+\d+", "New Zealand", "Global North", "Court of Appeal of New Zealand"),
+    (r"\b\d{4}\s+SCC\s+\d+", "Canada", "Global North", "Supreme Court of Canada"),
+    (r"\[\d{4}\]\s+\d+\s+S\.C\.R\.\s+\d+", "Canada", "Global North", "Supreme Court of Canada"),
+    (r"\[\d{4}\]\s+ZACC\s+\d+", "South Africa", "Global South", "Constitutional Court of South Africa"),
+    (r"\(\d{4}\)\s+\d+\s+SCC\s+\d+", "India", "Global South", "Supreme Court of India"),
+    (r"\bAIR\s+\d{4}\s+SC\s+\d+", "India", "Global South", "Supreme Court of India"),
+    
+    # EUROPEAN CASE LAW IDENTIFIERS (ECLI)
+    (r"\bECLI:NL:HR:\d{4}:\w+", "Netherlands", "Global North", "Dutch Supreme Court"),
+    (r"\bECLI:NL:RBDHA:\d{4}:\w+", "Netherlands", "Global North", "District Court of The Hague"),
+    (r"\bECLI:DE:BVerfG:\d{4}:\w+", "Germany", "Global North", "Federal Constitutional Court of Germany"),
+    (r"\bECLI:EU:[CT]:\d{4}:\d+", "European Union", "International", "Court of Justice of the European Union"),
+    (r"\bECLI:CE:ECHR:\d{4}:\w+", "Council of Europe", "International", "European Court of Human Rights"),
+    (r"\bI\.C\.J\.\s+Reports\s+\d{4}", "United Nations", "International", "International Court of Justice"),
+]
+
+# All signatures in one alternation (one scan per text); the named group
+# that matched indexes back into REPORTER_SIGNATURES
+REPORTER_SIGNATURE_PATTERN = re.compile(
+    '|'.join(f'(?P<r{n}>{pattern})' for n, (pattern, *_) in enumerate(REPORTER_SIGNATURES))
+)
+
 # ============================================================================
 # JURISDICTION ALIASES FOR NORMALIZATION
 # ============================================================================
@@ -305,6 +766,9 @@ JURISDICTION_ALIASES = {
     "Aotearoa": "New Zealand",
 }
 
+# Lowercased aliases so "usa" / "U.s." hit without lowering keys per call
+JURISDICTION_ALIASES_CI = {alias.lower(): name for alias, name in JURISDICTION_ALIASES.items()}
+
 # ============================================================================
 # KNOWN COUNTRIES LIST - FOR GEOGRAPHY PARSING
 # ============================================================================
@@ -380,12 +844,267 @@ KNOWN_COUNTRIES = {
     'European Union', 'International'
 }
 
+# ============================================================================
+# GLOBAL NORTH COUNTRIES - FOR REGION CLASSIFICATION
+# ============================================================================
+
+GLOBAL_NORTH_COUNTRIES = frozenset({
+    "United States", "United Kingdom", "Canada", "Australia", "New Zealand",
+    "Germany", "France", "Netherlands", "Belgium", "Switzerland", "Austria",
+    "Sweden", "Norway", "Denmark", "Finland", "Iceland", "Ireland", "Italy",
+    "Spain", "Portugal", "Greece", "Japan", "South Korea", "Singapore",
+    "European Union", "Council of Europe"
+})
+
+# ============================================================================
+# ZERO-SIGNAL PREFILTER (PREFILTER_MODE)
+# ============================================================================
+
+# Markers with no entry in the dictionaries above (international bodies and
+# common short forms), marker -> jurisdiction it points at
+EXTRA_SIGNAL_MARKERS = {
+    "ECHR": "Council of Europe",
+    "Strasbourg Court": "Council of Europe",
+    "Cour européenne des droits de l'homme": "Council of Europe",
+    "Corte IDH": "Organization of American States",
+    "Corte Interamericana": "Organization of American States",
+    "Human Rights Committee": "United Nations",
+    "Committee on the Rights of the Child": "United Nations",
+    "BVerfG": "Germany",
+    "Bundesgerichtshof": "Germany",
+    "Bundesgericht": "Switzerland",
+    "Luxembourg Court": "European Union",
+}
+
+def build_signal_markers() -> Dict[str, str]:
+    """
+    Collect every name that points at a specific jurisdiction (casefolded).
+
+    INPUT: None (reads the court, case, country and alias dictionaries)
+    ALGORITHM: Map each court / landmark case key to its country, each known
+               country and alias to itself, plus EXTRA_SIGNAL_MARKERS
+    OUTPUT: Dict of casefolded marker -> jurisdiction
+    """
+    markers = {}
+    for country in KNOWN_COUNTRIES:
+        if country != 'International':  # too generic to point anywhere
+            markers[country.casefold()] = country
+    for alias, country in JURISDICTION_ALIASES.items():
+        markers[alias.casefold()] = country
+    for patterns in (KNOWN_FOREIGN_COURTS, LANDMARK_CLIMATE_CASES):
+        for key, data in patterns.items():
+            markers[key.casefold()] = data['country']
+    for marker, country in EXTRA_SIGNAL_MARKERS.items():
+        markers[marker.casefold()] = country
+    return markers
+
+SIGNAL_MARKERS = build_signal_markers()
+
+if ahocorasick is not None:
+    SIGNAL_AUTOMATON = ahocorasick.Automaton()
+    for marker, country in SIGNAL_MARKERS.items():
+        SIGNAL_AUTOMATON.add_word(marker, (len(marker), country))
+    SIGNAL_AUTOMATON.make_automaton()
+else:
+    SIGNAL_AUTOMATON = None
+
+# Fallback when pyahocorasick is unavailable; longest markers first so the
+# alternation prefers "Supreme Court of India" over "India"
+SIGNAL_MARKER_PATTERN = re.compile(
+    r'(?<!\w)(?:' + '|'.join(re.escape(m) for m in sorted(SIGNAL_MARKERS, key=len, reverse=True)) + r')(?!\w)'
+)
+
+def scan_signal_markers(text_folded: str):
+    """Yield the jurisdiction of every whole-word marker in text_folded."""
+    if SIGNAL_AUTOMATON is None:
+        for match in SIGNAL_MARKER_PATTERN.finditer(text_folded):
+            yield SIGNAL_MARKERS[match.group()]
+        return
+    for end_index, (length, country) in SIGNAL_AUTOMATON.iter(text_folded):
+        start = end_index - length + 1
+        # Whole words only ("Oman" must not fire inside "woman")
+        if start > 0 and text_folded[start - 1].isalnum():
+            continue
+        if end_index + 1 < len(text_folded) and text_folded[end_index + 1].isalnum():
+            continue
+        yield country
+
+def has_foreign_signal(raw_text: str, source_jurisdiction: str) -> bool:
+    """
+    Cheap check for any sign of a non-domestic citation before Phase 2A.
+
+    INPUT: Document text and its source jurisdiction (from Phase 1)
+    ALGORITHM:
+        1. Any reporter signature (Tier 0 formats) from another jurisdiction
+        2. One casefolded pass over the text for court / case / country
+           markers; the first marker naming another jurisdiction is a hit
+    OUTPUT: False only when nothing in the text points outside the source
+    """
+    for match in REPORTER_SIGNATURE_PATTERN.finditer(raw_text):
+        if REPORTER_SIGNATURES[int(match.lastgroup[1:])][1] != source_jurisdiction:
+            return True
+    return any(country != source_jurisdiction
+               for country in scan_signal_markers(raw_text.casefold()))
+
 # ============================================================================
 # GLOBAL CACHES
 # ============================================================================
 
-# Cache for repeated citation origin lookups
-CITATION_ORIGIN_CACHE: Dict[str, Dict] = {}
+# Cache for repeated citation origin lookups, bounded (least recently used
+# entries are evicted) so long runs do not grow without limit. Backed by the
+# citation_origins table of the SQLite cache, so origins survive re-runs.
+CITATION_ORIGIN_CACHE_MAX = 100_000
+CITATION_ORIGIN_CACHE: "OrderedDict[str, Dict]" = OrderedDict()
+_ORIGIN_CACHE_LOCK = threading.Lock()  # documents run in parallel threads
+
+def origin_cache_key(case_name: str) -> str:
+    """Normalized, interned cache key (computed once per tier call)."""
+    return sys.intern(case_name.casefold().strip())
+
+def get_cached_origin(cache_key: str) -> Optional[Dict]:
+    """In-memory LRU first, then the persistent citation_origins table."""
+    with _ORIGIN_CACHE_LOCK:
+        result = CITATION_ORIGIN_CACHE.get(cache_key)
+        if result is not None:
+            CITATION_ORIGIN_CACHE.move_to_end(cache_key)
+            return result
+    
+    with _LLM_CACHE_LOCK:
+        row = get_llm_cache().execute(
+            "SELECT origin_json FROM citation_origins WHERE cache_key = ?", (cache_key,)
+        ).fetchone()
+    if row is None:
+        return None
+    result = json.loads(row[0])
+    remember_origin(cache_key, result)
+    return result
+
+def remember_origin(cache_key: str, result: Dict):
+    """In-memory LRU only."""
+    with _ORIGIN_CACHE_LOCK:
+        CITATION_ORIGIN_CACHE[cache_key] = result
+        CITATION_ORIGIN_CACHE.move_to_end(cache_key)
+        if len(CITATION_ORIGIN_CACHE) > CITATION_ORIGIN_CACHE_MAX:
+            CITATION_ORIGIN_CACHE.popitem(last=False)
+
+def cache_origin(cache_key: str, result: Dict):
+    """Remember an origin in memory and persist it for later runs."""
+    remember_origin(cache_key, result)
+    with _LLM_CACHE_LOCK:
+        cache = get_llm_cache()
+        cache.execute(
+            "INSERT OR REPLACE INTO citation_origins VALUES (?, ?, ?)",
+            (cache_key, json.dumps(result, ensure_ascii=False), datetime.utcnow().isoformat())
+        )
+        cache.commit()
+
+def warm_origin_cache(session) -> int:
+    """
+    Seed the origin cache from citations already saved in PostgreSQL, so a
+    fresh SQLite cache still starts with every confident Tier 2 answer.
+    
+    INPUT: SQLAlchemy session
+    ALGORITHM: One query over citation_extraction_phased for confident
+               (>= 0.7) Tier 2 origins; first row per normalized case name
+    OUTPUT: Number of case names added to the in-memory cache
+    """
+    rows = session.query(
+        CitationExtractionPhased.case_name,
+        CitationExtractionPhased.case_law_origin,
+        CitationExtractionPhased.case_law_region,
+        CitationExtractionPhased.cited_court,
+        CitationExtractionPhased.cited_year,
+        CitationExtractionPhased.origin_confidence,
+        CitationExtractionPhased.phase_3_model
+    ).filter(
+        CitationExtractionPhased.origin_identification_tier == 2,
+        CitationExtractionPhased.origin_confidence >= 0.7,
+        CitationExtractionPhased.case_name != None
+    ).all()
+    
+    added = 0
+    for case_name, origin, region, court, year, confidence, method in rows:
+        cache_key = origin_cache_key(case_name)
+        with _ORIGIN_CACHE_LOCK:
+            if cache_key in CITATION_ORIGIN_CACHE:
+                continue
+        remember_origin(cache_key, {
+            'origin': origin,
+            'region': region,
+            'court': court,
+            'year': year,
+            'tier': 2,
+            'confidence': float(confidence),
+            'method': method
+        })
+        added += 1
+    return added
+
+# Semantic cache over Tier 2 results: near-duplicate citations ("Urgenda v.
+# Netherlands" / "Urgenda Foundation v. State of the Netherlands") reuse an
+# earlier answer instead of another Sonnet call. Needs sentence-transformers.
+SEMANTIC_CACHE_MODEL = 'all-MiniLM-L6-v2'
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_MAX = 20_000
+
+_SEMANTIC_ENCODER = None
+SEMANTIC_CACHE_VECTORS: Optional[np.ndarray] = None  # unit-normalized rows
+SEMANTIC_CACHE_RESULTS: List[Dict] = []
+_SEMANTIC_CACHE_LOCK = threading.Lock()  # vectors and results must change together
+
+def semantic_cache_text(case_name: str, raw_text: str) -> str:
+    return f"{case_name} | {raw_text[:200]}"
+
+def embed_citations(texts: List[str]) -> Optional[np.ndarray]:
+    """Unit-normalized embeddings (one batched encode), or None if unavailable."""
+    global _SEMANTIC_ENCODER
+    if SentenceTransformer is None or not texts:
+        return None
+    with _SEMANTIC_CACHE_LOCK:
+        if _SEMANTIC_ENCODER is None:
+            _SEMANTIC_ENCODER = SentenceTransformer(SEMANTIC_CACHE_MODEL)
+    return _SEMANTIC_ENCODER.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+
+def semantic_cache_lookup(vectors: np.ndarray) -> List[Optional[Dict]]:
+    """
+    Nearest cached Tier 2 result per vector (cosine = dot product on unit
+    vectors); hits above SEMANTIC_CACHE_THRESHOLD come back with
+    confidence scaled by the similarity.
+    """
+    with _SEMANTIC_CACHE_LOCK:
+        cached_vectors, cached_results = SEMANTIC_CACHE_VECTORS, SEMANTIC_CACHE_RESULTS
+    if cached_vectors is None:
+        return [None] * len(vectors)
+    
+    similarities = vectors @ cached_vectors.T
+    best = similarities.argmax(axis=1)
+    hits = []
+    for row, col in enumerate(best):
+        similarity = float(similarities[row, col])
+        if similarity < SEMANTIC_CACHE_THRESHOLD:
+            hits.append(None)
+            continue
+        cached = cached_results[col]
+        hits.append(dict(cached, confidence=cached['confidence'] * similarity,
+                         method='semantic_cache'))
+    return hits
+
+def semantic_cache_add(vectors: np.ndarray, results: List[Dict]):
+    global SEMANTIC_CACHE_VECTORS, SEMANTIC_CACHE_RESULTS
+    if not results:
+        return
+    with _SEMANTIC_CACHE_LOCK:
+        # Rebind rather than mutate so concurrent lookups keep a consistent pair
+        if SEMANTIC_CACHE_VECTORS is None:
+            SEMANTIC_CACHE_VECTORS = vectors
+        else:
+            SEMANTIC_CACHE_VECTORS = np.vstack([SEMANTIC_CACHE_VECTORS, vectors])
+        SEMANTIC_CACHE_RESULTS = SEMANTIC_CACHE_RESULTS + list(results)
+        
+        # Keep the most recent entries
+        if len(SEMANTIC_CACHE_RESULTS) > SEMANTIC_CACHE_MAX:
+            SEMANTIC_CACHE_VECTORS = SEMANTIC_CACHE_VECTORS[-SEMANTIC_CACHE_MAX:]
+            SEMANTIC_CACHE_RESULTS = SEMANTIC_CACHE_RESULTS[-SEMANTIC_CACHE_MAX:]
 
 # ============================================================================
 # TRIAL BATCH FILTERING
@@ -409,10 +1128,11 @@ def get_trial_batch_document_uuids() -> Optional[Set[uuid.UUID]]:
         return None
     
     try:
-        df = pd.read_excel(DATABASE_FILE)
+        col_name = TRIAL_BATCH_CONFIG['COLUMN_NAME']
+        # Only the ID and flag columns are needed to build the filter set
+        df = read_database_excel(columns=['Document ID', col_name])
         logging.info(f"Loaded database with {len(df)} rows for trial batch filtering")
         
-        col_name = TRIAL_BATCH_CONFIG['COLUMN_NAME']
         if col_name not in df.columns:
             logging.error(f"❌ Trial batch column '{col_name}' not found!")
             return None
@@ -420,12 +1140,11 @@ def get_trial_batch_document_uuids() -> Optional[Set[uuid.UUID]]:
         true_values = TRIAL_BATCH_CONFIG['TRUE_VALUES']
         trial_batch_df = df[df[col_name].isin(true_values)]
         
-        # Convert Document IDs to UUIDs
-        def generate_document_uuid(document_id_str):
-            clean_id = str(document_id_str).strip().lower()
-            return uuid5(UUID_NAMESPACE, f"document_{clean_id}")
-        
-        doc_uuids = set(trial_batch_df['Document ID'].apply(generate_document_uuid))
+        # Convert Document IDs to UUIDs (same namespace/format as populate_metadata)
+        doc_uuids = {
+            uuid5(UUID_NAMESPACE, f"document_{str(x).strip().lower()}")
+            for x in trial_batch_df['Document ID'].to_numpy()
+        }
         
         logging.info("="*70)
         logging.info("TRIAL BATCH FILTERING")
@@ -444,13 +1163,15 @@ def get_trial_batch_document_uuids() -> Optional[Set[uuid.UUID]]:
 # HELPER FUNCTIONS
 # ============================================================================
 
+# Pure string -> string over a few hundred distinct values, so memoized
+@lru_cache(maxsize=4096)
 def normalize_jurisdiction(jurisdiction: str) -> str:
     """
     Normalize jurisdiction name using aliases.
     
     INPUT: Raw jurisdiction string (e.g., "USA", "U.K.")
     ALGORITHM:
-        1. Strip whitespace and check aliases
+        1. Strip whitespace and check aliases (case-insensitive)
         2. Return normalized name or original
     OUTPUT: Normalized jurisdiction string
     """
@@ -458,7 +1179,7 @@ def normalize_jurisdiction(jurisdiction: str) -> str:
         return jurisdiction
     
     jurisdiction = jurisdiction.strip()
-    return JURISDICTION_ALIASES.get(jurisdiction, jurisdiction)
+    return JURISDICTION_ALIASES_CI.get(jurisdiction.lower(), jurisdiction)
 
 def extract_json_from_text(text: str) -> Optional[Dict]:
     """
@@ -467,19 +1188,29 @@ def extract_json_from_text(text: str) -> Optional[Dict]:
     INPUT: Text potentially containing JSON
     ALGORITHM:
         1. Remove markdown code blocks
-        2. Find JSON object pattern
-        3. Parse and return
+        2. Slice from the first '{' to the last '}' (no regex scan)
+        3. Parse (orjson when installed) and return, falling back to the
+           whole cleaned text
     OUTPUT: Parsed JSON dict or None
     """
     try:
         # Remove markdown code blocks
-        text_clean = re.sub(r'```json\s*|\s*```', '', text).strip()
-        
-        # Try to find JSON object
-        match = re.search(r'\{[\s\S]*\}', text_clean)
-        if match:
-            return json.loads(match.group(0))
-        return json.loads(text_clean)
+        text_clean = MARKDOWN_FENCE_PATTERN.sub('', text).strip()
+    except Exception as e:
+        logging.debug(f"JSON parse error: {e}")
+        return None
+    
+    # Try to find JSON object
+    start = text_clean.find('{')
+    end = text_clean.rfind('}')
+    if start != -1 and end > start:
+        try:
+            return json_loads(text_clean[start:end + 1])
+        except Exception as e:
+            logging.debug(f"JSON parse error: {e}")
+    
+    try:
+        return json_loads(text_clean)
     except Exception as e:
         logging.debug(f"JSON parse error: {e}")
         return None
@@ -593,6 +1324,11 @@ def estimate_token_count(text: str) -> int:
     """
     return len(text) // CHARS_PER_TOKEN
 
+def extraction_max_tokens(text: str) -> int:
+    """Phase 2A output budget for a text (full document or chunk)."""
+    return min(MAX_OUTPUT_TOKENS,
+               EXTRACTION_BASE_OUTPUT_TOKENS + len(text) // EXTRACTION_CHARS_PER_OUTPUT_TOKEN)
+
 def should_chunk_document(text: str) -> bool:
     """
     Determine if document needs to be chunked based on size.
@@ -647,6 +1383,7 @@ def chunk_document(text: str) -> List[Tuple[str, int, int]]:
 # PHASE 1: SOURCE JURISDICTION IDENTIFICATION
 # ============================================================================
 
+@lru_cache(maxsize=4096)
 def get_source_jurisdiction(geographies_string: str) -> str:
     """
     Extract primary jurisdiction from Geographies field.
@@ -671,6 +1408,7 @@ def get_source_jurisdiction(geographies_string: str) -> str:
     # Normalize jurisdiction
     return normalize_jurisdiction(primary)
 
+@lru_cache(maxsize=4096)
 def get_source_region(country: str) -> str:
     """
     Classify country as Global North/South/International.
@@ -688,20 +1426,10 @@ def get_source_region(country: str) -> str:
     if not country or country == "Unknown":
         return "Unknown"
     
-    GLOBAL_NORTH_COUNTRIES = {
-        "United States", "United Kingdom", "Canada", "Australia", "New Zealand",
-        "Germany", "France", "Netherlands", "Belgium", "Switzerland", "Austria",
-        "Sweden", "Norway", "Denmark", "Finland", "Iceland", "Ireland", "Italy",
-        "Spain", "Portugal", "Greece", "Japan", "South Korea", "Singapore",
-        "European Union", "Council of Europe"
-    }
-    
-    if country in GLOBAL_NORTH_COUNTRIES:
-        return "Global North"
-    else:
-        return "Global South"
+    return "Global North" if country in GLOBAL_NORTH_COUNTRIES else "Global South"
 
 
+@lru_cache(maxsize=4096)
 def extract_country_from_geographies(geographies_string: str) -> str:
     """
     Extract country name from Case.geographies field.
@@ -729,40 +1457,27 @@ def extract_country_from_geographies(geographies_string: str) -> str:
     logging.debug(f"No recognized country in geography: {geographies_string}")
     return parts[0] if parts else "Unknown"
 
+def resolve_document_source(metadata_data, geographies: str) -> Tuple[str, str, str]:
+    """
+    Phase 1 for one document: (geographies, source_jurisdiction, source_region).
+    Falls back to metadata_data['Geographies'] when Case.geographies is NULL.
+    """
+    if not geographies and isinstance(metadata_data, dict):
+        geographies = metadata_data.get('Geographies', '')
+        logging.debug(f"  Case.geographies was NULL, using metadata_data: {geographies}")
+    
+    # Extract country from geography string
+    source_jurisdiction = extract_country_from_geographies(geographies)
+    return geographies, source_jurisdiction, get_source_region(source_jurisdiction)
+
 # ============================================================================
 # PHASE 2A: PURE EXTRACTION (MAXIMUM RECALL)
 # ============================================================================
 
-def generate_extraction_prompt(text: str, source_jurisdiction: str, 
-                               source_region: str, chunk_info: str = "") -> str:
-    """
-    Generate comprehensive extraction prompt for Phase 2A.
-    
-    KEY PRINCIPLE: Extract EVERYTHING - no filtering, no classification.
-    FOCUS: Maximum recall of case law references.
-    
-    INPUT:
-        - text: Document text (full or chunk)
-        - source_jurisdiction: Where the citing court is located
-        - source_region: Global North/South/International
-        - chunk_info: Optional info about which chunk this is
-    ALGORITHM:
-        1. Build detailed extraction instructions
-        2. List ALL 12 citation format patterns (RESTORED)
-        3. Specify JSON output format focused on extraction
-    OUTPUT: Complete prompt string
-    """
-    
-    chunk_notice = ""
-    if chunk_info:
-        chunk_notice = f"\n\nNOTE: This is {chunk_info}. Extract ALL case law references from this portion.\n"
-    
-    prompt = f"""You are extracting ALL judicial decision references from a legal document.
+# Identical for every document and chunk, so it is sent first as a
+# prompt-cached block; only the source info and text follow it
+EXTRACTION_PROMPT_PREFIX = """You are extracting ALL judicial decision references from a legal document.
 Your ONLY task is EXTRACTION - identify and extract every reference to case law.
-{chunk_notice}
-SOURCE COURT INFORMATION:
-- Jurisdiction: {source_jurisdiction}
-- Region: {source_region}
 
 ============================================================
 CRITICAL INSTRUCTIONS:
@@ -847,17 +1562,16 @@ EXTRACTION PATTERNS - CAPTURE ALL OF THESE:
 ============================================================
 OUTPUT FORMAT (JSON):
 ============================================================
-{{
+{
   "case_law_references": [
-    {{
+    {
       "case_name": "extracted case name (e.g., 'Urgenda Foundation v. State of the Netherlands')",
       "raw_text": "complete citation text exactly as it appears",
       "confidence": 0.0-1.0
-    }}
+    }
   ],
-  "total_references_found": number,
-  "extraction_notes": "any notes about the extraction process"
-}}
+  "total_references_found": number
+}
 
 ============================================================
 IMPORTANT REMINDERS:
@@ -867,12 +1581,77 @@ IMPORTANT REMINDERS:
 - Include citations even if you're uncertain about the format
 - Better to over-extract than to miss citations
 - Your job is ONLY extraction - classification comes later
+"""
+
+def generate_extraction_prompt(text: str, source_jurisdiction: str, 
+                               source_region: str, chunk_info: str = "") -> str:
+    """
+    Generate the document-specific part of the Phase 2A prompt.
+    
+    KEY PRINCIPLE: Extract EVERYTHING - no filtering, no classification.
+    FOCUS: Maximum recall of case law references.
+    
+    INPUT:
+        - text: Document text (full or chunk)
+        - source_jurisdiction: Where the citing court is located
+        - source_region: Global North/South/International
+        - chunk_info: Optional info about which chunk this is
+    ALGORITHM:
+        1. Add chunk notice and source court information
+        2. Append document text (instructions, all 12 citation patterns and
+           the JSON format live in EXTRACTION_PROMPT_PREFIX)
+    OUTPUT: Prompt string sent after EXTRACTION_PROMPT_PREFIX
+    """
+    
+    chunk_notice = ""
+    if chunk_info:
+        chunk_notice = f"NOTE: This is {chunk_info}. Extract ALL case law references from this portion.\n\n"
+    
+    prompt = f"""{chunk_notice}SOURCE COURT INFORMATION:
+- Jurisdiction: {source_jurisdiction}
+- Region: {source_region}
 
 Document text:
 {text}"""
     
     return prompt
 
+# Follow-up turns asking the model to fix an invalid Phase 2A reply
+EXTRACTION_JSON_RETRIES = 2
+JSON_RETRY_BACKOFF_SECONDS = 1.0
+
+def validate_extraction_json(data) -> Optional[str]:
+    """Describe the first schema problem in a Phase 2A reply, or None if valid."""
+    if not isinstance(data, dict):
+        return "response is not a parseable JSON object"
+    references = data.get('case_law_references')
+    if not isinstance(references, list):
+        return "'case_law_references' must be a list"
+    for n, ref in enumerate(references):
+        if not isinstance(ref, dict):
+            return f"case_law_references[{n}] must be an object"
+        if not isinstance(ref.get('case_name'), str) or not ref['case_name'].strip():
+            return f"case_law_references[{n}].case_name must be a non-empty string"
+        if not isinstance(ref.get('raw_text', ''), str):
+            return f"case_law_references[{n}].raw_text must be a string"
+        if not isinstance(ref.get('confidence', 0.0), (int, float)):
+            return f"case_law_references[{n}].confidence must be a number"
+    return None
+
+def request_json_repair(params: Dict, bad_response: str, error: str) -> Tuple[str, Dict, bool]:
+    """
+    Re-ask with the invalid reply and the validation error appended.
+    Returns (response_text, usage, truncated); truncated means the repair
+    itself stopped at max_tokens.
+    """
+    repair_params = dict(params, messages=params['messages'] + [
+        {"role": "assistant", "content": bad_response.rstrip() or "{}"},
+        {"role": "user", "content": f"Your JSON failed validation: {error}. "
+                                    "Return the complete corrected JSON only."}
+    ])
+    message = send_message(repair_params, stream=True)
+    return message.content[0].text, message_usage(message), message.stop_reason == "max_tokens"
+
 def extract_citations_from_text(document_id: uuid.UUID, text: str,
                                 source_jurisdiction: str, source_region: str,
                                 chunk_info: str = "") -> Optional[Dict]:
@@ -887,8 +1666,10 @@ def extract_citations_from_text(document_id: uuid.UUID, text: str,
         - chunk_info: Optional info about which chunk this is
     ALGORITHM:
         1. Generate extraction prompt
-        2. Call Claude Sonnet 4.5 with maximum output tokens
-        3. Parse JSON response
+        2. Call Claude Sonnet 4.5 with a text-sized output budget
+        3. Parse and validate JSON response; on failure send the error back
+           and retry (up to EXTRACTION_JSON_RETRIES, with backoff) at the
+           full MAX_OUTPUT_TOKENS budget
         4. Return extracted references
     OUTPUT: Dict with extracted references or None
     """
@@ -897,36 +1678,73 @@ def extract_citations_from_text(document_id: uuid.UUID, text: str,
         prompt = generate_extraction_prompt(text, source_jurisdiction, source_region, chunk_info)
         
         # Log token estimate
-        estimated_tokens = estimate_token_count(prompt)
+        estimated_tokens = estimate_token_count(EXTRACTION_PROMPT_PREFIX) + estimate_token_count(prompt)
         logging.info(f"  Prompt size: ~{estimated_tokens:,} tokens")
         
-        # Call Claude Sonnet 4.5 with maximum output tokens
+        # Call Claude Sonnet 4.5 with a text-sized output budget
+        model = "claude-sonnet-4-5-20250929"  # Sonnet 4.5 for precision
+        max_tokens = extraction_max_tokens(text)  # Sized to the text, up to 16,384
         start_time = time.time()
-        message = client.messages.create(
-            model="claude-sonnet-4-5-20250929",  # Sonnet 4.5 for precision
-            max_tokens=MAX_OUTPUT_TOKENS,  # Maximum output tokens (16,384)
-            temperature=0.0,
-            messages=[{"role": "user", "content": prompt}]
+        response_text, usage = call_claude_cached(
+            model,
+            max_tokens,
+            prompt,
+            prefix=EXTRACTION_PROMPT_PREFIX,
+            stream=True
         )
-        extraction_time = time.time() - start_time
         
-        # Parse response
-        response_text = message.content[0].text
+        # Parse and validate; invalid JSON goes back to the model with the error
         data = extract_json_from_text(response_text)
+        error = validate_extraction_json(data)
+        retries = 0
+        while error and retries < EXTRACTION_JSON_RETRIES:
+            retries += 1
+            logging.warning(f"  Extraction JSON invalid ({error}) - retry {retries}/{EXTRACTION_JSON_RETRIES}")
+            time.sleep(JSON_RETRY_BACKOFF_SECONDS * retries)
+            # Invalid JSON is most often a truncated reply (even after the
+            # doubled budget), so the full corrected JSON gets the maximum
+            response_text, retry_usage, truncated = request_json_repair(
+                build_request_params(model, MAX_OUTPUT_TOKENS, prompt, EXTRACTION_PROMPT_PREFIX),
+                response_text, error
+            )
+            merge_usage(usage, retry_usage)
+            data = extract_json_from_text(response_text)
+            error = validate_extraction_json(data)
+            if error and truncated:
+                # Another repair would hit the same ceiling
+                logging.warning(f"  JSON repair also hit max_tokens={MAX_OUTPUT_TOKENS} - not retrying")
+                break
+        extraction_time = time.time() - start_time
         
-        if not data:
-            logging.error(f"Failed to parse extraction JSON for document {document_id}")
-            logging.debug(f"Raw response: {response_text[:1000]}...")
-            return None
+        if retries and not error:
+            # Replace the malformed cached reply so re-runs get the repaired one
+            store_cached_response(llm_cache_key(model, max_tokens, prompt, EXTRACTION_PROMPT_PREFIX),
+                                  model, response_text, usage)
+        
+        if error:
+            if not isinstance(data, dict) or not isinstance(data.get('case_law_references'), list):
+                logging.error(f"Failed to parse extraction JSON for document {document_id}: {error}")
+                logging.debug(f"Raw response: {response_text[:1000]}...")
+                return None
+            # Usable structure with bad entries: keep the well-formed references
+            logging.warning(f"  Extraction JSON still invalid after retries ({error}) - dropping bad entries")
+            data['case_law_references'] = [
+                ref for ref in data['case_law_references']
+                if isinstance(ref, dict) and isinstance(ref.get('case_name'), str)
+            ]
         
         # Add metadata
+        data['phase_2_retries'] = retries
         data['extraction_time'] = extraction_time
-        data['tokens_input'] = message.usage.input_tokens
-        data['tokens_output'] = message.usage.output_tokens
+        data['tokens_input'] = usage['input_tokens']
+        data['tokens_output'] = usage['output_tokens']
+        data['tokens_cache_read'] = usage['cache_read_tokens']
+        data['tokens_cache_write'] = usage['cache_write_tokens']
         data['model'] = "claude-sonnet-4-5-20250929"
         
         logging.info(f"  Extraction complete: {data.get('total_references_found', 0)} references in {extraction_time:.1f}s")
-        logging.info(f"  Tokens: {message.usage.input_tokens:,} in / {message.usage.output_tokens:,} out")
+        logging.info(f"  Tokens: {usage['input_tokens']:,} in / {usage['output_tokens']:,} out "
+                     f"(prompt cache: {usage['cache_read_tokens']:,} read / {usage['cache_write_tokens']:,} written)")
         
         return data
         
@@ -978,12 +1796,21 @@ def extract_all_case_references_phase2(document_id: uuid.UUID, raw_text: str,
         - source_region: Global North/South/International
     ALGORITHM:
         1. Check if document needs chunking
-        2. If yes, chunk and process each chunk separately
+        2. If yes, chunk and process the chunks concurrently (CHUNK_CONCURRENCY)
         3. Merge and deduplicate results
         4. If no, process entire document at once
     OUTPUT: Dict with extracted references or None
     """
     
+    # Whole-document result cache (--cache-dir): skips chunking and every call
+    cache_key = None
+    if PHASE2_CACHE_DIR is not None:
+        cache_key = phase2_cache_key(raw_text, source_jurisdiction, source_region)
+        cached = load_phase2_result(cache_key)
+        if cached is not None:
+            logging.info(f"  Phase 2A result loaded from cache ({cache_key[:12]})")
+            return cached
+    
     # Log document size
     char_count = len(raw_text)
     estimated_tokens = estimate_token_count(raw_text)
@@ -997,16 +1824,31 @@ def extract_all_case_references_phase2(document_id: uuid.UUID, raw_text: str,
         all_references = []
         total_tokens_input = 0
         total_tokens_output = 0
+        total_cache_read = 0
+        total_cache_write = 0
+        total_retries = 0
         total_time = 0
         
-        for i, (chunk_text, start_pos, end_pos) in enumerate(chunks):
+        def extract_chunk(i: int) -> Optional[Dict]:
+            chunk_text, start_pos, end_pos = chunks[i]
             chunk_info = f"chunk {i+1} of {len(chunks)} (chars {start_pos:,}-{end_pos:,})"
             logging.info(f"  Processing {chunk_info}...")
-            
-            chunk_result = extract_citations_from_text(
+            return extract_citations_from_text(
                 document_id, chunk_text, source_jurisdiction, source_region, chunk_info
             )
-            
+        
+        # Chunks are independent calls, so they are sent concurrently
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(chunks), CHUNK_CONCURRENCY)) as executor:
+            chunk_results = list(executor.map(extract_chunk, range(len(chunks))))
+        
+        # A partial merge is still returned, but never cached under the
+        # whole-document key: the failed chunks are retried on the next run
+        complete = all(chunk_results)
+        if not complete:
+            failed = sum(1 for chunk_result in chunk_results if not chunk_result)
+            logging.warning(f"  {failed} of {len(chunks)} chunks failed - result will not be cached")
+        
+        for i, ((_, start_pos, _), chunk_result) in enumerate(zip(chunks, chunk_results)):
             if chunk_result:
                 # Adjust citation positions for chunk offset
                 for ref in chunk_result.get('case_law_references', []):
@@ -1016,17 +1858,23 @@ def extract_all_case_references_phase2(document_id: uuid.UUID, raw_text: str,
                 all_references.extend(chunk_result.get('case_law_references', []))
                 total_tokens_input += chunk_result.get('tokens_input', 0)
                 total_tokens_output += chunk_result.get('tokens_output', 0)
+                total_cache_read += chunk_result.get('tokens_cache_read', 0)
+                total_cache_write += chunk_result.get('tokens_cache_write', 0)
+                total_retries += chunk_result.get('phase_2_retries', 0)
                 total_time += chunk_result.get('extraction_time', 0)
         
         # Deduplicate citations from overlapping regions
         unique_references = deduplicate_citations(all_references)
         
-        return {
+        result = {
             'case_law_references': unique_references,
             'total_references_found': len(unique_references),
             'extraction_time': total_time,
             'tokens_input': total_tokens_input,
             'tokens_output': total_tokens_output,
+            'tokens_cache_read': total_cache_read,
+            'tokens_cache_write': total_cache_write,
+            'phase_2_retries': total_retries,
             'model': "claude-sonnet-4-5-20250929",
             'chunked': True,
             'chunk_count': len(chunks)
@@ -1038,42 +1886,292 @@ def extract_all_case_references_phase2(document_id: uuid.UUID, raw_text: str,
         result = extract_citations_from_text(
             document_id, raw_text, source_jurisdiction, source_region
         )
+        complete = result is not None
         if result:
             result['chunked'] = False
             result['chunk_count'] = 1
-        return result
+    
+    if result and complete and cache_key is not None:
+        save_phase2_result(cache_key, result)
+    return result
 
 # ============================================================================
-# PHASE 2B: FUNCTIONAL CLASSIFICATION (SEPARATE PASS)
+# PHASE 2A: CONTENT-ADDRESSED RESULT CACHE (--cache-dir)
 # ============================================================================
 
-def generate_functional_classification_prompt(citations: List[Dict], 
-                                              document_text_sample: str,
-                                              source_jurisdiction: str) -> str:
+# Bump whenever the Phase 2A prompt or chunking changes, so cached results
+# from the old prompt are no longer matched
+PHASE2_PROMPT_VERSION = "phase2-v5.4"
+
+# Set from --cache-dir; None disables the whole-document cache
+PHASE2_CACHE_DIR: Optional[Path] = None
+
+def phase2_cache_key(raw_text: str, source_jurisdiction: str, source_region: str) -> str:
+    """sha256(prompt version | source | sha256(text)) - same text, same key."""
+    text_digest = hashlib.sha256(raw_text.encode('utf-8')).hexdigest()
+    return hashlib.sha256(
+        f"{PHASE2_PROMPT_VERSION}|{source_jurisdiction}|{source_region}|{text_digest}".encode('utf-8')
+    ).hexdigest()
+
+def load_phase2_result(cache_key: str) -> Optional[Dict]:
+    path = PHASE2_CACHE_DIR / f"{cache_key}.json"
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.warning(f"  Ignoring unreadable Phase 2A cache entry {path.name}: {e}")
+        return None
+
+def save_phase2_result(cache_key: str, data: Dict):
+    """Write atomically (temp file + os.replace) so readers never see partial JSON."""
+    try:
+        PHASE2_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=PHASE2_CACHE_DIR, suffix='.tmp')
+    except OSError as e:
+        logging.warning(f"  Could not write Phase 2A cache entry: {e}")
+        return
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, PHASE2_CACHE_DIR / f"{cache_key}.json")
+    except (OSError, TypeError, ValueError) as e:
+        os.unlink(tmp_path)
+        logging.warning(f"  Could not write Phase 2A cache entry: {e}")
+
+# ============================================================================
+# PHASE 2A: MESSAGE BATCHES (BATCH_MODE)
+# ============================================================================
+
+# Batches API limits: 100,000 requests / 256 MB per batch; stay well under
+BATCH_MAX_REQUESTS = 10000
+BATCH_MAX_CHARS = 150_000_000
+BATCH_POLL_SECONDS = 60
+
+def iter_extraction_requests(documents):
+    """
+    Yield (cache_key, params) for every Phase 2A call the sequential loop
+    would make, using the same chunking and prompts, so batch results land
+    under the keys extract_citations_from_text looks up.
+    """
+    model = "claude-sonnet-4-5-20250929"
+    for doc in documents:
+        _, metadata_data, raw_text, _, geographies = doc
+        _, source_jurisdiction, source_region = resolve_document_source(metadata_data, geographies)
+        
+        if should_chunk_document(raw_text):
+            chunks = chunk_document(raw_text)
+            pieces = [
+                (chunk_text, f"chunk {i+1} of {len(chunks)} (chars {start_pos:,}-{end_pos:,})")
+                for i, (chunk_text, start_pos, end_pos) in enumerate(chunks)
+            ]
+        else:
+            pieces = [(raw_text, "")]
+        
+        for text, chunk_info in pieces:
+            prompt = generate_extraction_prompt(text, source_jurisdiction, source_region, chunk_info)
+            max_tokens = extraction_max_tokens(text)
+            key = llm_cache_key(model, max_tokens, prompt, EXTRACTION_PROMPT_PREFIX)
+            yield key, build_request_params(model, max_tokens, prompt, EXTRACTION_PROMPT_PREFIX)
+
+def run_message_batch(requests: List[Dict]) -> Dict:
     """
-    Generate prompt for functional classification of extracted citations.
+    Submit one Message Batch, poll until it ends and store every successful
+    response in the persistent LLM cache (custom_id is the cache key).
     
-    INPUT:
-        - citations: List of extracted citation dictionaries
-        - document_text_sample: Sample of document text for context
-        - source_jurisdiction: Source court jurisdiction
-    OUTPUT: Prompt string for functional classification
+    OUTPUT: Dict with succeeded/failed counts and billed token totals
+    """
+    batch = client.messages.batches.create(requests=requests)
+    logging.info(f"  Submitted batch {batch.id} ({len(requests)} requests)")
+    
+    while batch.processing_status != "ended":
+        time.sleep(BATCH_POLL_SECONDS)
+        batch = client.messages.batches.retrieve(batch.id)
+    
+    model_by_key = {r['custom_id']: r['params']['model'] for r in requests}
+    totals = {'succeeded': 0, 'failed': 0, 'input_tokens': 0, 'output_tokens': 0}
+    for entry in client.messages.batches.results(batch.id):
+        if entry.result.type != "succeeded":
+            totals['failed'] += 1
+            logging.warning(f"  Batch request {entry.custom_id} {entry.result.type}")
+            continue
+        message = entry.result.message
+        usage = message_usage(message)
+        totals['input_tokens'] += usage['input_tokens']
+        totals['output_tokens'] += usage['output_tokens']
+        if message.stop_reason == "max_tokens":
+            # Left uncached so the synchronous call retries with a larger budget
+            totals['failed'] += 1
+            continue
+        store_cached_response(entry.custom_id, model_by_key[entry.custom_id],
+                              message.content[0].text, usage)
+        totals['succeeded'] += 1
+    
+    return totals
+
+def prefetch_extractions_batch(documents) -> Dict:
     """
+    BATCH_MODE: run every uncached Phase 2A extraction through the Message
+    Batches API before the per-document loop.
     
-    # Format citations for the prompt
-    citations_list = ""
-    for i, cit in enumerate(citations[:30]):  # Limit to 30 citations per batch
-        citations_list += f"""
-{i+1}. Case: {cit.get('case_name', 'Unknown')}
-   Citation: {cit.get('raw_text', '')[:200]}
-   Context: {cit.get('context_snippet', '')}
+    INPUT: Document query tuples (as passed to process_single_document_phased)
+    ALGORITHM:
+        1. Build the exact Phase 2A requests (same prompts and chunking)
+        2. Skip requests already in the persistent LLM cache
+        3. Submit the rest in size-bounded batches and store the results
+    OUTPUT: Dict with succeeded/failed counts and billed token totals
+            (the later synchronous calls become cache hits)
+    """
+    totals = {'succeeded': 0, 'failed': 0, 'input_tokens': 0, 'output_tokens': 0}
+    pending, pending_chars, seen = [], 0, set()
+    
+    def submit():
+        for k, v in run_message_batch(pending).items():
+            totals[k] += v
+    
+    for key, params in iter_extraction_requests(documents):
+        if key in seen or is_response_cached(key):
+            continue
+        seen.add(key)
+        
+        size = len(params['messages'][0]['content'][-1]['text'])
+        if pending and (len(pending) >= BATCH_MAX_REQUESTS or pending_chars + size > BATCH_MAX_CHARS):
+            submit()
+            pending, pending_chars = [], 0
+        pending.append({'custom_id': key, 'params': params})
+        pending_chars += size
+    
+    if pending:
+        submit()
+    
+    logging.info(f"  Batch extraction: {totals['succeeded']} succeeded, {totals['failed']} failed | "
+                 f"Tokens: {totals['input_tokens']:,} in / {totals['output_tokens']:,} out")
+    return totals
+
+# ============================================================================
+# PHASE 2A: MULTI-DOCUMENT PACKING (PACK_MODE)
+# ============================================================================
+
+# Short documents are packed several to a request. A pack stays within the
+# input budget and the combined per-document output budgets fit one reply.
+PACK_MAX_DOC_CHARS = 20_000
+PACK_MAX_DOCS = 20
+PACK_MAX_CHARS = 80_000 * CHARS_PER_TOKEN  # ~80K input tokens
+
+PACKED_EXTRACTION_NOTICE = """NOTE: This request contains SEVERAL separate documents, each wrapped in
+<DOC id="..."> ... </DOC> with its own source court information.
+Extract the references of each document independently, following all the
+instructions above, and return ONE JSON object keyed by document id:
+{
+  "1": {"case_law_references": [...], "total_references_found": number},
+  "2": {"case_law_references": [...], "total_references_found": number}
+}
+Include every document id, with an empty list if a document cites no cases.
+
 """
+
+def generate_packed_extraction_prompt(pack: List[Tuple[str, str, str]]) -> str:
+    """Packed Phase 2A prompt: one <DOC> block per (text, jurisdiction, region)."""
+    blocks = [
+        f'<DOC id="{n}">\n{generate_extraction_prompt(text, jurisdiction, region)}\n</DOC>'
+        for n, (text, jurisdiction, region) in enumerate(pack, 1)
+    ]
+    return PACKED_EXTRACTION_NOTICE + "\n\n".join(blocks)
+
+def iter_extraction_packs(documents):
+    """
+    Yield packs of (cache_key, text, jurisdiction, region) for the short,
+    not yet cached documents, bounded by PACK_MAX_DOCS, PACK_MAX_CHARS and
+    a combined output budget of MAX_OUTPUT_TOKENS.
+    """
+    model = "claude-sonnet-4-5-20250929"
+    pack, pack_chars, pack_tokens, seen = [], 0, 0, set()
+    for doc in documents:
+        _, metadata_data, raw_text, _, geographies = doc
+        if len(raw_text) > PACK_MAX_DOC_CHARS:
+            continue
+        _, source_jurisdiction, source_region = resolve_document_source(metadata_data, geographies)
+        
+        prompt = generate_extraction_prompt(raw_text, source_jurisdiction, source_region)
+        max_tokens = extraction_max_tokens(raw_text)
+        key = llm_cache_key(model, max_tokens, prompt, EXTRACTION_PROMPT_PREFIX)
+        if key in seen or is_response_cached(key):
+            continue
+        seen.add(key)
+        
+        if pack and (len(pack) >= PACK_MAX_DOCS or pack_chars + len(raw_text) > PACK_MAX_CHARS
+                     or pack_tokens + max_tokens > MAX_OUTPUT_TOKENS):
+            yield pack
+            pack, pack_chars, pack_tokens = [], 0, 0
+        pack.append((key, raw_text, source_jurisdiction, source_region))
+        pack_chars += len(raw_text)
+        pack_tokens += max_tokens
+    
+    if pack:
+        yield pack
+
+def prefetch_extractions_packed(documents) -> Dict:
+    """
+    PACK_MODE: extract short documents several per call before the
+    per-document loop.
+    
+    INPUT: Document query tuples (as passed to process_single_document_phased)
+    ALGORITHM:
+        1. Group uncached short documents into packs (iter_extraction_packs)
+        2. Send every pack concurrently (call_claude_cached_many), sharing
+           the prompt-cached EXTRACTION_PROMPT_PREFIX
+        3. Split each reply by document id; every valid part is stored under
+           that document's own Phase 2A cache key
+    OUTPUT: Dict with stored/failed document counts and billed token totals
+            (documents whose part was missing or invalid - or whose pack
+            failed to parse - fall back to their own call in the loop)
+    """
+    model = "claude-sonnet-4-5-20250929"
+    packs = list(iter_extraction_packs(documents))
+    totals = {'packs': len(packs), 'stored': 0, 'failed': 0, 'input_tokens': 0, 'output_tokens': 0}
+    if not packs:
+        return totals
+    
+    requests = [
+        (MAX_OUTPUT_TOKENS, generate_packed_extraction_prompt([entry[1:] for entry in pack]))
+        for pack in packs
+    ]
+    responses = call_claude_cached_many(model, requests, prefix=EXTRACTION_PROMPT_PREFIX)
+    
+    no_usage = {'input_tokens': 0, 'output_tokens': 0}
+    for pack, response in zip(packs, responses):
+        data = extract_json_from_text(response[0]) if response else None
+        if response:
+            totals['input_tokens'] += response[1]['input_tokens']
+            totals['output_tokens'] += response[1]['output_tokens']
+        if not isinstance(data, dict):
+            totals['failed'] += len(pack)
+            continue
+        
+        for n, (key, *_) in enumerate(pack, 1):
+            part = data.get(str(n))
+            if validate_extraction_json(part) is not None:
+                totals['failed'] += 1
+                continue
+            # Billed once for the whole pack (above), not per document
+            store_cached_response(key, model, json.dumps(part, ensure_ascii=False), no_usage)
+            totals['stored'] += 1
     
-    prompt = f"""You are classifying HOW a court used each citation in its judgment.
+    logging.info(f"  Packed extraction: {totals['packs']} calls, {totals['stored']} documents stored, "
+                 f"{totals['failed']} left for per-document calls | "
+                 f"Tokens: {totals['input_tokens']:,} in / {totals['output_tokens']:,} out")
+    return totals
+
+# ============================================================================
+# PHASE 2B: FUNCTIONAL CLASSIFICATION (SEPARATE PASS)
+# ============================================================================
 
-SOURCE COURT: {source_jurisdiction}
+# Static Phase 2B instructions, sent as a prompt-cached prefix ahead of the
+# source court and citation list
+FUNCTIONAL_CLASSIFICATION_PROMPT_PREFIX = """You are classifying HOW a court used each citation in its judgment.
 
-For each citation below, determine:
+For each citation listed after these instructions, determine:
 
 1. FUNCTIONAL USE:
    - "parties_argument": The court is recounting what a party argued
@@ -1091,24 +2189,47 @@ KEY SIGNALS:
 - "dismissed": "distinguish", "not applicable", "unlike", "differs from", "little transfer value"
 - "contributed": "following", "applying", "as held in", "consistent with", "we adopt"
 
-CITATIONS TO CLASSIFY:
-{citations_list}
-
 OUTPUT FORMAT (JSON):
-{{
+{
   "classifications": [
-    {{
+    {
       "citation_index": 1,
       "functional_use": "parties_argument|dismissed|contributed",
       "opinion_type": "majority|dissent|concurrence|unclear",
       "key_signals": ["list", "of", "signals"]
-    }}
+    }
   ]
-}}
+}
 
-If uncertain, use "contributed" with low confidence."""
+If uncertain, use "contributed" with low confidence.
+"""
+
+def generate_functional_classification_prompt(citations: List[Dict], 
+                                              source_jurisdiction: str) -> str:
+    """
+    Generate the document-specific part of the functional classification
+    prompt (instructions live in FUNCTIONAL_CLASSIFICATION_PROMPT_PREFIX).
     
-    return prompt
+    INPUT:
+        - citations: List of extracted citation dictionaries
+        - source_jurisdiction: Source court jurisdiction
+    OUTPUT: Prompt string sent after FUNCTIONAL_CLASSIFICATION_PROMPT_PREFIX
+    """
+    
+    # Format citations for the prompt
+    citations_list = "".join(
+        f"""
+{i+1}. Case: {cit.get('case_name', 'Unknown')}
+   Citation: {cit.get('raw_text', '')[:200]}
+   Context: {cit.get('context_snippet', '')}
+"""
+        for i, cit in enumerate(citations[:30])  # Limit to 30 citations per batch
+    )
+    
+    return f"""SOURCE COURT: {source_jurisdiction}
+
+CITATIONS TO CLASSIFY:
+{citations_list}"""
 
 def classify_citations_functionally(citations: List[Dict], 
                                    raw_text: str,
@@ -1130,24 +2251,16 @@ def classify_citations_functionally(citations: List[Dict],
         return {}
     
     try:
-        # Take a sample of the document for context (first 10K chars)
-        text_sample = raw_text[:10000]
-        
-        # Generate prompt
-        prompt = generate_functional_classification_prompt(
-            citations, text_sample, source_jurisdiction
-        )
+        # Generate prompt (the document text itself is not sent in this pass)
+        prompt = generate_functional_classification_prompt(citations, source_jurisdiction)
         
         # Call Claude Sonnet 4.5
-        message = client.messages.create(
-            model="claude-sonnet-4-5-20250929",
-            max_tokens=4000,
-            temperature=0.0,
-            messages=[{"role": "user", "content": prompt}]
+        response_text, _ = call_claude_cached(
+            "claude-sonnet-4-5-20250929", 4000, prompt,
+            prefix=FUNCTIONAL_CLASSIFICATION_PROMPT_PREFIX
         )
         
         # Parse response
-        response_text = message.content[0].text
         data = extract_json_from_text(response_text)
         
         if not data:
@@ -1176,6 +2289,33 @@ def classify_citations_functionally(citations: List[Dict],
 # PHASE 3: ORIGIN IDENTIFICATION (3-TIER APPROACH)
 # ============================================================================
 
+def identify_origin_tier0_reporter(case_name: str, raw_text: str) -> Optional[Dict]:
+    """
+    Tier 0: Recognize reporter / neutral citation formats (e.g. "347 U.S. 483",
+    "[2017] UKSC 5") that pin down the court without any lookup.
+    
+    INPUT:
+        - case_name: Extracted case name
+        - raw_text: Raw citation text
+    ALGORITHM: One REPORTER_SIGNATURE_PATTERN scan of the citation text,
+               then of the case name
+    OUTPUT: Dict with origin data or None
+    """
+    match = REPORTER_SIGNATURE_PATTERN.search(raw_text) or REPORTER_SIGNATURE_PATTERN.search(case_name)
+    if not match:
+        return None
+    
+    _, country, region, court = REPORTER_SIGNATURES[int(match.lastgroup[1:])]
+    logging.debug(f"Tier 0: Reporter match '{match.group()}' for '{case_name}' -> {country}")
+    return {
+        'origin': country,
+        'region': region,
+        'court': court,
+        'tier': 0,
+        'confidence': 0.98,
+        'method': 'reporter_signature_match'
+    }
+
 def identify_origin_tier1_dictionary(case_name: str, raw_text: str) -> Optional[Dict]:
     """
     Tier 1: Lookup in KNOWN_FOREIGN_COURTS and LANDMARK_CLIMATE_CASES.
@@ -1185,128 +2325,165 @@ def identify_origin_tier1_dictionary(case_name: str, raw_text: str) -> Optional[
         - raw_text: Raw citation text
     ALGORITHM:
         1. Check cache first
-        2. Search KNOWN_FOREIGN_COURTS for court name match
-        3. Search LANDMARK_CLIMATE_CASES for case name match
+        2. Search KNOWN_FOREIGN_COURTS for court name match (automaton)
+        3. Search LANDMARK_CLIMATE_CASES for case name match (automaton)
         4. Return if found
     OUTPUT: Dict with origin data or None
     """
     # Check cache
-    cache_key = case_name.lower().strip()
-    if cache_key in CITATION_ORIGIN_CACHE:
+    cache_key = origin_cache_key(case_name)
+    cached = get_cached_origin(cache_key)
+    if cached is not None:
         logging.debug(f"Tier 1: Cache hit for '{case_name}'")
-        return CITATION_ORIGIN_CACHE[cache_key]
-    
-    # Search KNOWN_FOREIGN_COURTS
-    for court_pattern, court_data in KNOWN_FOREIGN_COURTS.items():
-        if court_pattern.lower() in raw_text.lower() or court_pattern.lower() in case_name.lower():
-            result = {
-                'origin': court_data['country'],
-                'region': court_data['region'],
-                'court': court_pattern,
-                'tier': 1,
-                'confidence': 0.95,
-                'method': 'dictionary_court_match'
-            }
-            # Cache result
-            CITATION_ORIGIN_CACHE[cache_key] = result
-            logging.debug(f"Tier 1: Court match for '{case_name}' -> {court_data['country']}")
-            return result
+        return cached
+    
+    # Casefold each text once; pattern keys were casefolded at import
+    raw_folded = raw_text.casefold()
+    name_folded = case_name.casefold()
+    
+    # Search KNOWN_FOREIGN_COURTS (single automaton pass per text)
+    court_match = first_pattern_match(COURT_AUTOMATON, KNOWN_FOREIGN_COURTS_CF, raw_folded, name_folded)
+    if court_match:
+        court_pattern, court_data = court_match
+        result = {
+            'origin': court_data['country'],
+            'region': court_data['region'],
+            'court': court_pattern,
+            'tier': 1,
+            'confidence': 0.95,
+            'method': 'dictionary_court_match'
+        }
+        # Cache result
+        cache_origin(cache_key, result)
+        logging.debug(f"Tier 1: Court match for '{case_name}' -> {court_data['country']}")
+        return result
     
     # Search LANDMARK_CLIMATE_CASES
-    for case_pattern, case_data in LANDMARK_CLIMATE_CASES.items():
-        if case_pattern.lower() in case_name.lower():
-            result = {
-                'origin': case_data['country'],
-                'region': case_data['region'],
-                'court': case_data.get('court', 'Unknown'),
-                'year': case_data.get('year'),
-                'tier': 1,
-                'confidence': 0.95,
-                'method': 'dictionary_case_match'
-            }
-            # Cache result
-            CITATION_ORIGIN_CACHE[cache_key] = result
-            logging.debug(f"Tier 1: Case match for '{case_name}' -> {case_data['country']}")
-            return result
+    case_match = first_pattern_match(CASE_AUTOMATON, LANDMARK_CLIMATE_CASES_CF, name_folded)
+    if case_match:
+        case_pattern, case_data = case_match
+        result = {
+            'origin': case_data['country'],
+            'region': case_data['region'],
+            'court': case_data.get('court', 'Unknown'),
+            'year': case_data.get('year'),
+            'tier': 1,
+            'confidence': 0.95,
+            'method': 'dictionary_case_match'
+        }
+        # Cache result
+        cache_origin(cache_key, result)
+        logging.debug(f"Tier 1: Case match for '{case_name}' -> {case_data['country']}")
+        return result
     
     logging.debug(f"Tier 1: No match for '{case_name}'")
     return None
 
-def identify_origin_tier2_sonnet(case_name: str, raw_text: str) -> Optional[Dict]: 
-    """
-    Tier 2: Use Claude Sonnet for intelligent origin identification.
-    
-    INPUT:
-        - case_name: Extracted case name
-        - raw_text: Raw citation text
-    ALGORITHM:
-        1. Build prompt
-        2. Call Claude Sonnet 4.5
-        3. Parse origin identification
-        4. Return with confidence score
-    OUTPUT: Dict with origin data or None
-    """
-    try:
-        prompt = f"""Identify the jurisdiction/country of origin for this legal case citation.
+def tier2_result_from_json(data: Dict) -> Dict:
+    """Map one Sonnet origin JSON object to the Phase 3 origin dict."""
+    return {
+        'origin': data.get('origin_country'),
+        'region': data.get('region'),
+        'court': data.get('court'),
+        'year': data.get('year'),
+        'tier': 2,
+        'confidence': data.get('confidence', 0.0),
+        'method': 'sonnet_analysis',
+        'reasoning': data.get('reasoning', '')
+    }
 
-CASE NAME: {case_name}
-RAW CITATION: {raw_text}
+# Batched Tier 2: all of a document's Tier 1 misses in one call per group
+TIER2_BATCH_SIZE = 40
+TIER2_BATCH_TOKENS_PER_CASE = 150
 
-Analyze ALL available signals:
+TIER2_BATCH_PROMPT_PREFIX = """Identify the jurisdiction/country of origin for EACH legal case citation listed below.
+
+Analyze ALL available signals for each citation:
 1. Court name in citation
 2. Citation format (e.g., "U.S." suggests United States, "UKSC" suggests UK)
 3. Case name patterns
 4. Legal system indicators
 
-Respond in JSON:
-{{
-  "origin_country": "country name",
-  "region": "Global North|Global South|International",
-  "court": "court name if identifiable",
-  "year": year if mentioned,
-  "confidence": 0.0-1.0,
-  "reasoning": "brief explanation of how you determined the origin"
-}}
-
-If you cannot determine the origin with reasonable confidence (>0.5), return confidence 0.0.
+Respond in JSON with exactly one entry per citation, using its number as case_id:
+{
+  "origins": [
+    {
+      "case_id": citation number,
+      "origin_country": "country name",
+      "region": "Global North|Global South|International",
+      "court": "court name if identifiable",
+      "year": year if mentioned,
+      "confidence": 0.0-1.0,
+      "reasoning": "brief explanation of how you determined the origin"
+    }
+  ]
+}
+
+If you cannot determine an origin with reasonable confidence (>0.5), return confidence 0.0 for that entry.
 """
+
+def identify_origins_tier2_sonnet_batch(cases: List[Dict]) -> Tuple[Dict[int, Dict], int]:
+    """
+    Tier 2 for many citations: one Sonnet call per TIER2_BATCH_SIZE cases
+    instead of one per case, with the groups sent concurrently.
+    
+    INPUT: cases - dicts with case_id (int), case_name, raw_text
+    ALGORITHM:
+        1. Number each group's citations after TIER2_BATCH_PROMPT_PREFIX
+        2. Call Claude Sonnet 4.5 for all groups at once (call_claude_cached_many)
+        3. Map the returned arrays back by case_id, keep confidence >= 0.5
+        4. Cache high-confidence (>= 0.7) results
+    OUTPUT: ({case_id: origin dict}, number of API calls made)
+    """
+    if not cases:
+        return {}, 0
+    
+    groups = [cases[i:i + TIER2_BATCH_SIZE] for i in range(0, len(cases), TIER2_BATCH_SIZE)]
+    requests = []
+    for group in groups:
+        prompt = "CITATIONS:\n" + "\n".join(
+            f"[{c['case_id']}] CASE NAME: {c['case_name']}\n    RAW CITATION: {c['raw_text']}"
+            for c in group
+        ) + "\n"
+        max_tokens = min(MAX_OUTPUT_TOKENS, 500 + TIER2_BATCH_TOKENS_PER_CASE * len(group))
+        requests.append((max_tokens, prompt))
+    
+    responses = call_claude_cached_many(
+        "claude-sonnet-4-5-20250929",  # Sonnet 4.5
+        requests,
+        prefix=TIER2_BATCH_PROMPT_PREFIX
+    )
+    
+    results = {}
+    api_calls = 0
+    for group, response in zip(groups, responses):
+        if response is None:
+            continue
+        response_text, usage = response
+        if not usage['cached']:
+            api_calls += 1
         
-        message = client.messages.create(
-            model="claude-sonnet-4-5-20250929",  # Sonnet 4.5
-            max_tokens=500,
-            temperature=0.0,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        response_text = message.content[0].text
         data = extract_json_from_text(response_text)
-        
-        if not data or data.get('confidence', 0) < 0.5:
-            logging.debug(f"Tier 2: Low confidence for '{case_name}'")
-            return None
-        
-        result = {
-            'origin': data.get('origin_country'),
-            'region': data.get('region'),
-            'court': data.get('court'),
-            'year': data.get('year'),
-            'tier': 2,
-            'confidence': data.get('confidence', 0.0),
-            'method': 'sonnet_analysis',
-            'reasoning': data.get('reasoning', '')
-        }
-        
-        # Cache if high confidence
-        if result['confidence'] >= 0.7:
-            cache_key = case_name.lower().strip()
-            CITATION_ORIGIN_CACHE[cache_key] = result
-        
-        logging.debug(f"Tier 2: Identified '{case_name}' -> {result['origin']} (confidence: {result['confidence']})")
-        return result
-        
-    except Exception as e:
-        logging.error(f"Error in Tier 2 identification: {e}")
-        return None
+        if not data:
+            logging.error(f"Tier 2: Failed to parse batch response ({len(group)} citations)")
+            continue
+        
+        names = {c['case_id']: c['case_name'] for c in group}
+        for entry in data.get('origins', []):
+            try:
+                case_id = int(entry.get('case_id'))
+            except (TypeError, ValueError):
+                continue
+            if case_id not in names or entry.get('confidence', 0) < 0.5:
+                continue
+            
+            result = tier2_result_from_json(entry)
+            if result['confidence'] >= 0.7:
+                cache_origin(origin_cache_key(names[case_id]), result)
+            results[case_id] = result
+    
+    logging.debug(f"Tier 2: Identified {len(results)} of {len(cases)} citations in {api_calls} calls")
+    return results, api_calls
 
 def identify_origin_tier3_websearch(case_name: str, raw_text: str) -> Optional[Dict]:
     """
@@ -1322,35 +2499,7 @@ def identify_origin_tier3_websearch(case_name: str, raw_text: str) -> Optional[D
     logging.debug(f"Tier 3: Web search not implemented for '{case_name}'")
     return None
 
-def identify_case_origin(case_name: str, raw_text: str) -> Dict:
-    """
-    Identify origin using 3-tier approach.
-    
-    INPUT:
-        - case_name: Extracted case name
-        - raw_text: Raw citation text
-    ALGORITHM:
-        Tier 1: Dictionary lookup (fastest)
-        Tier 2: LLM Analysis (Sonnet)
-        Tier 3: Web Search (fallback - placeholder)
-    OUTPUT: Dict with origin, region, confidence, method
-    """
-    # Tier 1: Dictionary lookup
-    tier1_result = identify_origin_tier1_dictionary(case_name, raw_text)
-    if tier1_result:
-        return tier1_result
-    
-    # Tier 2: LLM Analysis
-    tier2_result = identify_origin_tier2_sonnet(case_name, raw_text)
-    if tier2_result and tier2_result['confidence'] >= 0.5:
-        return tier2_result
-    
-    # Tier 3: Web search (if implemented)
-    tier3_result = identify_origin_tier3_websearch(case_name, raw_text)
-    if tier3_result:
-        return tier3_result
-    
-    # All tiers failed - return unknown
+def unknown_origin(case_name: str) -> Dict:
     logging.warning(f"Phase 3: Could not identify origin for '{case_name}'")
     return {
         'origin': 'Unknown',
@@ -1362,61 +2511,229 @@ def identify_case_origin(case_name: str, raw_text: str) -> Dict:
         'method': 'failed_identification'
     }
 
+def identify_case_origins(references: List[Dict]) -> Tuple[List[Dict], int]:
+    """
+    Phase 3 for a whole document, with every Tier 1 miss sent to Tier 2
+    together rather than one Sonnet round-trip per citation.
+    
+    INPUT: references - Phase 2A reference dicts (case_name, raw_text)
+    ALGORITHM:
+        1. Tier 0 reporter format, then Tier 1 dictionary lookup per reference
+        2. Semantic cache lookup for the distinct missed case names
+        3. Batched Tier 2 over whatever is still missing
+        4. Tier 3 / Unknown for anything still unresolved
+    OUTPUT: (origin dicts aligned with references, Tier 2 API calls made)
+    """
+    origins: List[Optional[Dict]] = [None] * len(references)
+    misses: Dict[str, Dict] = {}  # cache key -> Tier 2 case
+    pending = []  # (reference index, cache key)
+    
+    for i, ref in enumerate(references):
+        case_name = ref.get('case_name', '')
+        raw_text = ref.get('raw_text', '')
+        local_result = (identify_origin_tier0_reporter(case_name, raw_text)
+                        or identify_origin_tier1_dictionary(case_name, raw_text))
+        if local_result:
+            origins[i] = local_result
+            continue
+        
+        key = origin_cache_key(case_name)
+        if key not in misses:
+            misses[key] = {'case_id': len(misses) + 1, 'case_name': case_name, 'raw_text': raw_text}
+        pending.append((i, key))
+    
+    # Near-duplicates of earlier Tier 2 answers skip Sonnet
+    cases = list(misses.values())
+    resolved: Dict[int, Dict] = {}
+    vectors = embed_citations([semantic_cache_text(c['case_name'], c['raw_text']) for c in cases])
+    if vectors is not None:
+        for case, hit in zip(cases, semantic_cache_lookup(vectors)):
+            if hit is not None:
+                resolved[case['case_id']] = hit
+    
+    tier2_cases = [c for c in cases if c['case_id'] not in resolved]
+    tier2_results, api_calls = identify_origins_tier2_sonnet_batch(tier2_cases)
+    resolved.update(tier2_results)
+    
+    if vectors is not None:
+        # Remember confident new Tier 2 answers for later documents
+        new_rows = [n for n, c in enumerate(cases)
+                    if c['case_id'] in tier2_results and tier2_results[c['case_id']]['confidence'] >= 0.7]
+        semantic_cache_add(vectors[new_rows], [tier2_results[cases[n]['case_id']] for n in new_rows])
+    
+    for i, key in pending:
+        result = resolved.get(misses[key]['case_id'])
+        if result is None:
+            case_name = references[i].get('case_name', '')
+            result = (identify_origin_tier3_websearch(case_name, references[i].get('raw_text', ''))
+                      or unknown_origin(case_name))
+        origins[i] = result
+    
+    return origins, api_calls
+
 # ============================================================================
 # PHASE 4: CLASSIFICATION
 # ============================================================================
 
-def classify_citation_type(source_jurisdiction: str, source_region: str,
-                          case_origin: str, case_region: str) -> Tuple[str, bool]:
+# (source_region, case_region) -> (citation_type, is_cross_jurisdictional)
+# for citations between different jurisdictions. Unknown origins and
+# same-jurisdiction (Domestic) citations are resolved before the lookup.
+CITATION_TYPE_TABLE = {
+    # International source
+    ('International', 'International'): ('International Citation', True),
+    ('International', 'Global North'):  ('Foreign Citation', True),
+    ('International', 'Global South'):  ('Foreign Citation', True),
+    # Global North source
+    ('Global North', 'International'):  ('International Citation', True),
+    ('Global North', 'Global North'):   ('Foreign Citation', True),
+    ('Global North', 'Global South'):   ('Foreign Citation', True),
+    # Global South source
+    ('Global South', 'International'):  ('International Citation', True),
+    ('Global South', 'Global North'):   ('Foreign Citation', True),
+    ('Global South', 'Global South'):   ('Foreign Citation', True),
+    # Source region could not be resolved
+    ('Unknown', 'International'):       ('International Citation', True),
+    ('Unknown', 'Global North'):        ('Foreign Citation', True),
+    ('Unknown', 'Global South'):        ('Foreign Citation', True),
+}
+
+def classify_citation_type_batch(source_jurisdiction: str, source_region: str,
+                                 case_origins: np.ndarray,
+                                 case_regions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Phase 4: Classify citation type based on source and origin.
+    Phase 4: Classify citation types for a whole document, over parallel
+    arrays of case origins and regions with vector masks.
     
     INPUT:
-        - source_jurisdiction: Where citing court is located
-        - source_region: Global North/South/International
-        - case_origin: Where cited case is from
-        - case_region: Global North/South/International
+        - source_jurisdiction / source_region: the citing court (shared)
+        - case_origins / case_regions: object arrays, one entry per citation
     ALGORITHM:
-        1. Normalize jurisdictions
-        2. Compare source vs. case jurisdiction
-        3. Apply classification logic
-    OUTPUT: (citation_type, is_cross_jurisdictional)
+        1. Normalize the source once and each distinct origin once
+        2. Masks: unknown, same jurisdiction (domestic)
+        3. Unknown -> 'Unknown'; domestic -> 'Domestic'; everything else
+           is typed by CITATION_TYPE_TABLE, looked up once per distinct
+           case region (the source region is shared)
+    OUTPUT: (citation_types, is_cross_jurisdictional) arrays
     """
-    # Normalize jurisdictions
     source_norm = normalize_jurisdiction(source_jurisdiction)
-    case_norm = normalize_jurisdiction(case_origin)
-    
-    # Handle unknowns
-    if case_origin == 'Unknown' or case_region == 'Unknown':
-        return 'Unknown', False
-    
-    # Same jurisdiction = Domestic (NOT cross-jurisdictional)
-    if source_norm == case_norm:
-        return 'Domestic', False
-    
-    # Different jurisdictions = Cross-jurisdictional
-    is_cross_jurisdictional = True
-    
-    # Classification logic
-    if source_region == 'International' or case_region == 'International':
-        if source_region == 'International' and case_region == 'International':
-            # Both international
-            return 'International Citation', True
-        elif source_region == 'International':
-            # Source is international, citing a national case
-            return 'Foreign Citation', True
-        else:
-            # Source is national, citing international
-            return 'International Citation', True
+    normalized = {origin: normalize_jurisdiction(origin) for origin in set(case_origins.tolist())}
+    case_norm = np.array([normalized[origin] for origin in case_origins.tolist()], dtype=object)
+    
+    unknown = (case_origins == 'Unknown') | (case_regions == 'Unknown')
+    domestic = ~unknown & (case_norm == source_norm)
+    
+    by_region = {
+        region: CITATION_TYPE_TABLE.get((source_region, region), ('Foreign Citation', True))
+        for region in set(case_regions.tolist())
+    }
+    region_list = case_regions.tolist()
+    citation_types = np.array([by_region[region][0] for region in region_list], dtype=object)
+    is_cross_jurisdictional = np.array([by_region[region][1] for region in region_list], dtype=bool)
+    
+    citation_types[domestic] = 'Domestic'
+    citation_types[unknown] = 'Unknown'
+    is_cross_jurisdictional &= ~(unknown | domestic)
+    return citation_types, is_cross_jurisdictional
+
+# ============================================================================
+# CITATION ROWS: COPY FROM STDIN
+# ============================================================================
+
+# Below this many rows per document the Core executemany insert is cheaper
+# than building a CSV buffer
+COPY_MIN_ROWS = 20
+
+# citation_extraction_phased columns streamed by COPY. extraction_id and the
+# timestamps have Python-side defaults only, so they are filled in here
+CITATION_COPY_COLUMNS = (
+    'extraction_id', 'document_id', 'case_id', 'source_jurisdiction', 'source_region',
+    'case_name', 'raw_citation_text', 'location_in_document',
+    'case_law_origin', 'case_law_region', 'origin_identification_tier', 'origin_confidence',
+    'citation_type', 'is_cross_jurisdictional', 'cited_court', 'cited_year',
+    'phase_2_model', 'phase_3_model', 'phase_4_model', 'processing_time_seconds',
+    'api_calls_used', 'requires_manual_review', 'manual_review_reason',
+    'created_at', 'updated_at'
+)
+CITATION_COPY_SQL = (
+    f"COPY {CitationExtractionPhased.__tablename__} ({', '.join(CITATION_COPY_COLUMNS)}) "
+    "FROM STDIN WITH (FORMAT CSV)"
+)
+
+def csv_field(value):
+    """CSV field for COPY: unquoted empty is NULL, anything else is quoted."""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return '"' + str(value).replace('"', '""') + '"'
+
+def save_citation_records(session, citation_records: List[Dict]):
+    """
+    Write one document's citation rows inside the caller's SAVEPOINT.
+    
+    INPUT: session, citation row dicts (CitationExtractionPhased columns)
+    ALGORITHM:
+        1. Fewer than COPY_MIN_ROWS rows: Core executemany insert
+        2. Otherwise stream them as CSV through COPY FROM STDIN on the
+           session's own connection, so they commit (or roll back) with it
+    OUTPUT: None
+    """
+    if len(citation_records) < COPY_MIN_ROWS:
+        # Core insert on the table: plain dicts, no ORM bulk bookkeeping
+        session.execute(CitationExtractionPhased.__table__.insert(), citation_records)
+        return
+    
+    now = datetime.utcnow()
+    buffer = io.StringIO()
+    for row in citation_records:
+        record = dict(row, extraction_id=uuid.uuid4(), created_at=now, updated_at=now)
+        buffer.write(','.join(csv_field(record.get(col)) for col in CITATION_COPY_COLUMNS))
+        buffer.write('\n')
+    buffer.seek(0)
+    
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(CITATION_COPY_SQL, buffer)
+    finally:
+        cursor.close()
+
+def save_empty_summary(session, document_id, started_at: datetime, start_ns: int,
+                       api_calls: int = 0, tokens_in: int = 0, tokens_out: int = 0):
+    """
+    Record a successful extraction that yielded no citations.
     
-    # Both are national courts (different countries)
-    return 'Foreign Citation', True
+    INPUT: session, document_id, the document's started_at / start_ns
+           clock readings, and the API usage spent on it so far
+    ALGORITHM: Zero-count CitationExtractionPhasedSummary added inside a
+               SAVEPOINT; the caller commits
+    OUTPUT: None
+    """
+    processing_time = (time.perf_counter_ns() - start_ns) / 1e9
+    summary = CitationExtractionPhasedSummary(
+        document_id=document_id,
+        total_references_extracted=0,
+        foreign_citations_count=0,
+        international_citations_count=0,
+        foreign_international_citations_count=0,
+        total_api_calls=api_calls,
+        total_tokens_input=tokens_in,
+        total_tokens_output=tokens_out,
+        total_cost_usd=(tokens_in/1e6 * 3.0) + (tokens_out/1e6 * 15.0),
+        extraction_started_at=started_at,
+        extraction_completed_at=started_at + timedelta(seconds=processing_time),
+        total_processing_time_seconds=processing_time,
+        extraction_success=True,
+        average_confidence=0.0,
+        items_requiring_review=0
+    )
+    with session.begin_nested():
+        session.add(summary)
 
 # ============================================================================
 # MAIN PROCESSING FUNCTION
 # ============================================================================
 
-def process_single_document_phased(doc_tuple, session, stats: Dict) -> bool:
+def process_single_document_phased(doc_tuple, session) -> Tuple[bool, Counter]:
     """
     Process a single document through all phases with separation of concerns.
     
@@ -1424,7 +2741,6 @@ def process_single_document_phased(doc_tuple, session, stats: Dict) -> bool:
         - doc_tuple: Database query result tuple
                      (document_id, metadata_data, raw_text, case_id, geographies)
         - session: SQLAlchemy session
-        - stats: Statistics dictionary
     ALGORITHM:
         Phase 1: Identify source jurisdiction from Case.geographies
         Phase 2A: Extract ALL case references (pure extraction)
@@ -1432,7 +2748,7 @@ def process_single_document_phased(doc_tuple, session, stats: Dict) -> bool:
         Phase 3: Identify origin for each reference
         Phase 4: Classify each citation
         Save results to database
-    OUTPUT: True if successful, False otherwise
+    OUTPUT: (True if successful else False, this document's stats Counter)
     """
     # Unpack query results
     document_id = doc_tuple[0]
@@ -1441,11 +2757,17 @@ def process_single_document_phased(doc_tuple, session, stats: Dict) -> bool:
     case_id = doc_tuple[3]
     geographies = doc_tuple[4]
     
-    start_time = time.time()
+    # Monotonic clock for the duration; one wall-clock read (naive UTC, as the
+    # TIMESTAMP columns store it) from which completed_at is derived
+    start_ns = time.perf_counter_ns()
+    started_at = datetime.now(timezone.utc).replace(tzinfo=None)
     total_api_calls = 0
     total_tokens_input = 0
     total_tokens_output = 0
     
+    # Local counts only, so documents share no mutable state; callers sum them
+    stats = Counter()
+    
     try:
         logging.info(f"\n{'='*70}")
         logging.info(f"Processing Document: {document_id}")
@@ -1456,18 +2778,23 @@ def process_single_document_phased(doc_tuple, session, stats: Dict) -> bool:
         # ====================================================================
         logging.info("Phase 1: Identifying source jurisdiction...")
         
-        # Fallback to metadata_data if Case.geographies is NULL
-        if not geographies and isinstance(metadata_data, dict):
-            geographies = metadata_data.get('Geographies', '')
-            logging.debug(f"  Case.geographies was NULL, using metadata_data: {geographies}")
-        
-        # Extract country from geography string
-        source_jurisdiction = extract_country_from_geographies(geographies)
-        source_region = get_source_region(source_jurisdiction)
+        geographies, source_jurisdiction, source_region = resolve_document_source(
+            metadata_data, geographies
+        )
         
         logging.info(f"  Geography raw: {geographies}")
         logging.info(f"  Source: {source_jurisdiction} ({source_region})")
         
+        # Nothing in the text points outside the source jurisdiction, so
+        # Phase 2A could only return domestic references
+        if CONFIG.get('PREFILTER_MODE') and not has_foreign_signal(raw_text, source_jurisdiction):
+            logging.info("  No foreign/international signal - skipping Phase 2A")
+            save_empty_summary(session, document_id, started_at, start_ns)
+            
+            stats['processed'] += 1
+            stats['pre_filtered'] += 1
+            return True, stats
+        
         # ====================================================================
         # PHASE 2A: PURE EXTRACTION
         # ====================================================================
@@ -1480,7 +2807,7 @@ def process_single_document_phased(doc_tuple, session, stats: Dict) -> bool:
         if not phase2a_result:
             logging.error("  Phase 2A failed - skipping document")
             stats['phase2_failures'] += 1
-            return False
+            return False, stats
         
         total_api_calls += phase2a_result.get('chunk_count', 1)
         total_tokens_input += phase2a_result.get('tokens_input', 0)
@@ -1491,31 +2818,12 @@ def process_single_document_phased(doc_tuple, session, stats: Dict) -> bool:
         
         if len(references) == 0:
             logging.info("  No references found - creating summary with zero citations")
-            
-            # Create summary record
-            summary = CitationExtractionPhasedSummary(
-                document_id=document_id,
-                total_references_extracted=0,
-                foreign_citations_count=0,
-                international_citations_count=0,
-                foreign_international_citations_count=0,
-                total_api_calls=total_api_calls,
-                total_tokens_input=total_tokens_input,
-                total_tokens_output=total_tokens_output,
-                total_cost_usd=(total_tokens_input/1e6 * 3.0) + (total_tokens_output/1e6 * 15.0),
-                extraction_started_at=datetime.fromtimestamp(start_time),
-                extraction_completed_at=datetime.utcnow(),
-                total_processing_time_seconds=time.time() - start_time,
-                extraction_success=True,
-                average_confidence=0.0,
-                items_requiring_review=0
-            )
-            session.add(summary)
-            session.commit()
+            save_empty_summary(session, document_id, started_at, start_ns,
+                               total_api_calls, total_tokens_input, total_tokens_output)
             
             stats['processed'] += 1
             stats['no_citations'] += 1
-            return True
+            return True, stats
         
         # ====================================================================
         # PHASE 2B: FUNCTIONAL CLASSIFICATION (OPTIONAL SEPARATE PASS)
@@ -1535,89 +2843,73 @@ def process_single_document_phased(doc_tuple, session, stats: Dict) -> bool:
         logging.info("Phase 3: Identifying case origins...")
         logging.info("Phase 4: Classifying citations...")
         
+        # Phase 3: Identify origins (Tier 1 misses go to Tier 2 in one batch)
+        origins, tier2_api_calls = identify_case_origins(references)
+        total_api_calls += tier2_api_calls
+        
+        # Phase 4: Classify (Geographic) for all citations at once
+        citation_types, cross_flags = classify_citation_type_batch(
+            source_jurisdiction,
+            source_region,
+            np.array([o['origin'] for o in origins], dtype=object),
+            np.array([o['region'] for o in origins], dtype=object)
+        )
+        
+        # Per-citation bookkeeping as columns, one row per reference
+        functional = [functional_classifications.get(i, {}) for i in range(len(references))]
+        citations = pd.DataFrame({
+            'citation_type': citation_types,
+            'is_cross_jurisdictional': cross_flags.astype(bool),
+            'confidence': [float(o.get('confidence') or 0.0) for o in origins],
+            'functional_use': [f.get('functional_use', 'unknown') for f in functional],
+            'opinion_type': [f.get('opinion_type', ref.get('location', 'unclear'))
+                             for f, ref in zip(functional, references)]
+        })
+        
+        # Skip domestic citations
+        citations = citations[citations['citation_type'] != 'Domestic']
+        logging.debug(f"  Skipping {len(references) - len(citations)} domestic citations")
+        needs_review_mask = citations['confidence'] < 0.7
+        
+        # Count by type (geographic)
+        type_counts = citations['citation_type'].value_counts()
+        foreign_count = int(type_counts.get('Foreign Citation', 0))
+        international_count = int(type_counts.get('International Citation', 0))
+        foreign_international_count = int(type_counts.get('Foreign International Citation', 0))
+        
+        # Count by functional use
+        use_counts = citations['functional_use'].value_counts()
+        functional_parties_count = int(use_counts.get('parties_argument', 0))
+        functional_dismissed_count = int(use_counts.get('dismissed', 0))
+        functional_contributed_count = int(use_counts.get('contributed', 0))
+        
+        # Count by opinion type
+        majority_count = int((citations['opinion_type'] == 'majority').sum())
+        dissent_count = int(citations['opinion_type'].isin(['dissent', 'concurrence']).sum())
+        
+        # Manual review flags
+        items_for_review = int(needs_review_mask.sum())
+        
         citation_records = []
-        foreign_count = 0
-        international_count = 0
-        foreign_international_count = 0
-        confidences = []
-        items_for_review = 0
-        
-        # Functional classification counters
-        functional_parties_count = 0
-        functional_dismissed_count = 0
-        functional_contributed_count = 0
-        majority_count = 0
-        dissent_count = 0
-        
-        for i, ref in enumerate(references):
-            # Phase 3: Identify origin
-            origin_data = identify_case_origin(
-                ref.get('case_name', ''),
-                ref.get('raw_text', '')
-            )
-            
-            # Track API calls (Tier 2 uses Sonnet)
-            if origin_data.get('tier') == 2:
-                total_api_calls += 1
-            
-            # Phase 4: Classify (Geographic)
-            citation_type, is_cross_jurisdictional = classify_citation_type(
-                source_jurisdiction,
-                source_region,
-                origin_data['origin'],
-                origin_data['region']
-            )
-            
-            # Skip domestic citations
-            if citation_type == 'Domestic':
-                logging.debug(f"  Skipping domestic citation: {ref.get('case_name', 'Unknown')}")
-                continue
-            
-            # Get functional classification from Phase 2B
-            func_class = functional_classifications.get(i, {})
-            functional_use = func_class.get('functional_use', 'unknown')
-            opinion_type = func_class.get('opinion_type', ref.get('location', 'unclear'))
-            key_signals = func_class.get('key_signals', [])
-            
-            # Count by type (geographic)
-            if citation_type == 'Foreign Citation':
-                foreign_count += 1
-            elif citation_type == 'International Citation':
-                international_count += 1
-            elif citation_type == 'Foreign International Citation':
-                foreign_international_count += 1
-            
-            # Count by functional use
-            if functional_use == 'parties_argument':
-                functional_parties_count += 1
-            elif functional_use == 'dismissed':
-                functional_dismissed_count += 1
-            elif functional_use == 'contributed':
-                functional_contributed_count += 1
-            
-            # Count by opinion type
-            if opinion_type == 'majority':
-                majority_count += 1
-            elif opinion_type in ['dissent', 'concurrence']:
-                dissent_count += 1
-            
-            # Check if needs manual review
-            confidence = origin_data.get('confidence', 0.0)
-            confidences.append(confidence)
-            needs_review = confidence < 0.7
-            if needs_review:
-                items_for_review += 1
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e9
+        for i, citation_type, is_cross_jurisdictional, confidence, functional_use, opinion_type, needs_review in zip(
+            citations.index, citations['citation_type'], citations['is_cross_jurisdictional'],
+            citations['confidence'], citations['functional_use'], citations['opinion_type'],
+            needs_review_mask
+        ):
+            ref = references[i]
+            origin_data = origins[i]
             
             # Prepare functional metadata for storage
             functional_metadata = {
                 'functional_use': functional_use,
                 'opinion_type': opinion_type,
-                'key_signals': key_signals,
+                'key_signals': functional[i].get('key_signals', []),
                 'v5_3_extraction': True
             }
             
-            # Create citation record using existing schema fields
-            citation_record = CitationExtractionPhased(
+            # Citation row (existing schema fields) for the bulk insert
+            citation_records.append(dict(
                 document_id=document_id,
                 case_id=case_id,
                 
@@ -1638,7 +2930,7 @@ def process_single_document_phased(doc_tuple, session, stats: Dict) -> bool:
                 
                 # Phase 4 - Geographic Classification
                 citation_type=citation_type,
-                is_cross_jurisdictional=is_cross_jurisdictional,
+                is_cross_jurisdictional=bool(is_cross_jurisdictional),
                 
                 # Extended metadata
                 cited_court=origin_data.get('court'),
@@ -1648,18 +2940,16 @@ def process_single_document_phased(doc_tuple, session, stats: Dict) -> bool:
                 phase_2_model='claude-sonnet-4-5-20250929',
                 phase_3_model=origin_data.get('method'),
                 phase_4_model='rule-based',
-                processing_time_seconds=time.time() - start_time,
+                processing_time_seconds=processing_time,
                 api_calls_used=total_api_calls,
                 
                 # Quality control - store functional metadata in manual_review_reason
-                requires_manual_review=needs_review,
+                requires_manual_review=bool(needs_review),
                 manual_review_reason=(
                     f"Low confidence: {confidence:.2f} | FUNC: {json.dumps(functional_metadata)}"
                     if needs_review else f"FUNC: {json.dumps(functional_metadata)}"
                 )
-            )
-            
-            citation_records.append(citation_record)
+            ))
         
         # ====================================================================
         # SAVE TO DATABASE
@@ -1668,7 +2958,7 @@ def process_single_document_phased(doc_tuple, session, stats: Dict) -> bool:
         
         # Calculate totals
         total_cross_jurisdictional = foreign_count + international_count + foreign_international_count
-        avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        avg_confidence = float(citations['confidence'].mean()) if len(citations) else 0.0
         
         # Calculate cost (Sonnet 4.5: $3/M input, $15/M output)
         total_cost = (total_tokens_input/1e6 * 3.0) + (total_tokens_output/1e6 * 15.0)
@@ -1684,20 +2974,20 @@ def process_single_document_phased(doc_tuple, session, stats: Dict) -> bool:
             total_tokens_input=total_tokens_input,
             total_tokens_output=total_tokens_output,
             total_cost_usd=total_cost,
-            extraction_started_at=datetime.fromtimestamp(start_time),
-            extraction_completed_at=datetime.utcnow(),
-            total_processing_time_seconds=time.time() - start_time,
+            extraction_started_at=started_at,
+            extraction_completed_at=started_at + timedelta(seconds=processing_time),
+            total_processing_time_seconds=processing_time,
             extraction_success=True,
             average_confidence=avg_confidence,
             items_requiring_review=items_for_review
         )
         
-        # Add all records
-        session.add(summary)
-        for citation in citation_records:
-            session.add(citation)
-        
-        session.commit()
+        # Summary plus one bulk write for all citations, in one SAVEPOINT so a
+        # failure undoes only this document; the caller commits in windows
+        with session.begin_nested():
+            session.add(summary)
+            if citation_records:
+                save_citation_records(session, citation_records)
         
         # Update statistics
         stats['processed'] += 1
@@ -1729,10 +3019,11 @@ def process_single_document_phased(doc_tuple, session, stats: Dict) -> bool:
         logging.info(f"  Needs review: {items_for_review}")
         logging.info(f"  Cost: ${total_cost:.4f}")
         
-        return True
+        return True, stats
         
     except Exception as e:
-        session.rollback()
+        # A failed save already rolled back its own SAVEPOINT; earlier
+        # documents in the open transaction are kept
         logging.error(f"Error processing document: {e}")
         import traceback
         logging.error(traceback.format_exc())
@@ -1740,20 +3031,206 @@ def process_single_document_phased(doc_tuple, session, stats: Dict) -> bool:
         
         # Create failed summary
         try:
+            processing_time = (time.perf_counter_ns() - start_ns) / 1e9
             summary = CitationExtractionPhasedSummary(
                 document_id=document_id,
-                extraction_started_at=datetime.fromtimestamp(start_time),
-                extraction_completed_at=datetime.utcnow(),
-                total_processing_time_seconds=time.time() - start_time,
+                extraction_started_at=started_at,
+                extraction_completed_at=started_at + timedelta(seconds=processing_time),
+                total_processing_time_seconds=processing_time,
                 extraction_success=False,
                 extraction_error=str(e)[:500]
             )
-            session.add(summary)
-            session.commit()
+            with session.begin_nested():
+                session.add(summary)
         except:
             pass
         
-        return False
+        return False, stats
+
+# ============================================================================
+# CONCURRENT DOCUMENT PROCESSING
+# ============================================================================
+
+# Documents in flight at once. Each one is dominated by blocking Anthropic
+# round-trips, so they run in worker threads driven by an asyncio loop.
+DOCUMENT_CONCURRENCY = 8
+
+# Rows per server-side cursor fetch when streaming the document query
+DOCUMENT_FETCH_SIZE = 100
+
+def documents_query(session):
+    """
+    Decisions with extracted text, as the tuples process_single_document_phased
+    takes: (document_id, metadata_data, raw_text, case_id, geographies).
+    """
+    return session.query(
+        Document.document_id,
+        Document.metadata_data,
+        ExtractedText.raw_text,
+        Case.case_id,
+        Case.geographies
+    ).join(
+        ExtractedText, Document.document_id == ExtractedText.document_id
+    ).join(
+        Case, Document.case_id == Case.case_id
+    ).filter(
+        ExtractedText.raw_text != None,
+        Document.is_decision == True
+    )
+
+# Each pooled session commits once per this many documents (every document
+# writes inside its own SAVEPOINT) instead of once per document
+COMMIT_EVERY_DOCUMENTS = 50
+
+def commit_session_slot(slot: Dict):
+    """Commit a pooled session's open window of documents."""
+    try:
+        slot['session'].commit()
+    except Exception as e:
+        slot['session'].rollback()
+        logging.error(f"Commit of {slot['pending']} documents failed (they will be redone next run): {e}")
+    slot['pending'] = 0
+
+def process_document_in_session(doc_tuple, slot: Dict) -> Tuple[bool, Counter]:
+    """
+    Run process_single_document_phased on a pooled session (used by one
+    thread at a time), committing every COMMIT_EVERY_DOCUMENTS documents.
+    """
+    try:
+        return process_single_document_phased(doc_tuple, slot['session'])
+    finally:
+        slot['pending'] += 1
+        if slot['pending'] >= COMMIT_EVERY_DOCUMENTS:
+            commit_session_slot(slot)
+
+async def process_documents_async(documents: Iterable, Session, stats: Counter,
+                                  total: Optional[int] = None):
+    """
+    Process all documents concurrently.
+    
+    INPUT:
+        - documents: query result tuples for process_single_document_phased
+                     (any iterable - e.g. a streaming query)
+        - Session: sessionmaker for the pool of worker sessions
+        - stats: statistics Counter, updated as documents finish
+        - total: document count for the progress bar, if known
+    ALGORITHM:
+        1. Pool of DOCUMENT_CONCURRENCY sessions (asyncio.Queue); the next
+           document is only read once a session is free, so at most that
+           many run (each in a worker thread) and the rest stay unfetched
+        2. Every document returns its own stats Counter
+        3. Add each document's counts into stats as it completes, advancing
+           the progress bar
+        4. Commit whatever each session still holds, then close it
+    OUTPUT: None (stats updated in place)
+    """
+    pool = asyncio.Queue()
+    for _ in range(DOCUMENT_CONCURRENCY):
+        pool.put_nowait({'session': Session(), 'pending': 0})
+    
+    async def run_document(doc_tuple, slot: Dict, progress):
+        try:
+            _, doc_stats = await asyncio.to_thread(process_document_in_session, doc_tuple, slot)
+        finally:
+            pool.put_nowait(slot)
+        # Back on the event loop thread, so merging needs no lock
+        stats.update(doc_stats)
+        progress.update(1)
+    
+    running = set()
+    try:
+        with tqdm(total=total, desc="Processing Documents") as progress:
+            for doc in documents:
+                slot = await pool.get()  # Wait for a free session
+                task = asyncio.create_task(run_document(doc, slot, progress))
+                running.add(task)
+                task.add_done_callback(running.discard)
+            await asyncio.gather(*running)
+    finally:
+        # Only sessions back in the pool; one still held by a thread is left alone
+        while not pool.empty():
+            slot = pool.get_nowait()
+            if slot['pending']:
+                commit_session_slot(slot)
+            slot['session'].close()
+
+# ============================================================================
+# MULTI-PROCESS DOCUMENT PROCESSING (--processes)
+# ============================================================================
+
+# Worker processes, each running the concurrent driver above on its shard
+# of the documents (set from --processes; 1 keeps everything in-process)
+DOCUMENT_PROCESSES = 1
+
+def init_document_worker(log_queue, phase2_cache_dir: Optional[Path]):
+    """
+    Pool initializer: route worker log records to the parent's
+    QueueListener and carry over the command-line cache directory.
+    """
+    global PHASE2_CACHE_DIR
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+    PHASE2_CACHE_DIR = phase2_cache_dir
+
+def iter_shard_documents(session, document_ids: List) -> Iterable[Tuple]:
+    """Fetch a shard's document rows DOCUMENT_FETCH_SIZE ids at a time."""
+    for i in range(0, len(document_ids), DOCUMENT_FETCH_SIZE):
+        yield from documents_query(session).filter(
+            Document.document_id.in_(document_ids[i:i + DOCUMENT_FETCH_SIZE])
+        )
+
+def process_document_shard(document_ids: List) -> Counter:
+    """
+    Worker process: its own engine, sessions and Anthropic client (module
+    globals are per process), then the concurrent driver over the shard.
+    Only ids cross the process boundary; the rows (and their raw_text) are
+    fetched here in small batches as the driver asks for them.
+    
+    OUTPUT: stats Counter for the shard, summed by the parent
+    """
+    engine = create_engine(URL.create(**DB_CONFIG), insertmanyvalues_page_size=1000)
+    Session = sessionmaker(bind=engine)
+    read_session = Session()
+    stats = Counter()
+    try:
+        documents = iter_shard_documents(read_session, document_ids)
+        asyncio.run(process_documents_async(documents, Session, stats, len(document_ids)))
+    finally:
+        read_session.close()
+        engine.dispose()
+    return stats
+
+def process_documents_sharded(document_ids: List, stats: Counter):
+    """
+    Split document ids round-robin over DOCUMENT_PROCESSES spawned workers
+    and add each shard's stats Counter as it finishes.
+    
+    Workers are spawned, not forked, so they never share the parent's open
+    HTTP connections or SQLite handle.
+    """
+    shards = [document_ids[i::DOCUMENT_PROCESSES] for i in range(DOCUMENT_PROCESSES)]
+    
+    # Only the parent writes log output; workers enqueue records
+    mp_context = multiprocessing.get_context('spawn')
+    log_queue = mp_context.Queue(-1)
+    log_listener = logging.handlers.QueueListener(
+        log_queue, *logging.getLogger().handlers, respect_handler_level=True
+    )
+    log_listener.start()
+    
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=DOCUMENT_PROCESSES,
+                                                    mp_context=mp_context,
+                                                    initializer=init_document_worker,
+                                                    initargs=(log_queue, PHASE2_CACHE_DIR)) as executor:
+            futures = [executor.submit(process_document_shard, shard)
+                       for shard in shards if shard]
+            for future in concurrent.futures.as_completed(futures):
+                stats.update(future.result())
+    finally:
+        log_listener.stop()
 
 # ============================================================================
 # MAIN EXECUTION
@@ -1768,8 +3245,8 @@ def main():
         1. Load trial batch filter (if enabled)
         2. Query documents classified as decisions (is_decision = True)
         3. Filter by trial batch if enabled
-        4. Exclude already processed documents
-        5. Process each document through all phases
+        4. Exclude already processed documents (anti-join)
+        5. Process documents through all phases, DOCUMENT_CONCURRENCY at a time
         6. Report comprehensive statistics
     OUTPUT: Statistics printed to log
     """
@@ -1789,7 +3266,7 @@ def main():
     logging.info("  - ALL 12 extraction patterns restored")
     logging.info("  - Separation of concerns: extraction vs. classification")
     logging.info("  - Dynamic chunking for documents > 600K chars")
-    logging.info("  - Maximum output tokens (16,384)")
+    logging.info("  - Output token budget sized per text (up to 16,384)")
     logging.info("  - Uses existing database schema (no reset required)")
     logging.info("="*70)
     
@@ -1797,7 +3274,8 @@ def main():
     trial_batch_uuids = get_trial_batch_document_uuids()
     
     # Connect to database
-    engine = create_engine(URL.create(**DB_CONFIG))
+    # Bulk citation inserts go out as multi-row VALUES, up to 1000 rows a statement
+    engine = create_engine(URL.create(**DB_CONFIG), insertmanyvalues_page_size=1000)
     Session = sessionmaker(bind=engine)
     session = Session()
     
@@ -1806,23 +3284,12 @@ def main():
     logging.info("✓ Database tables verified/created")
     
     try:
+        logging.info(f"✓ Origin cache warmed with {warm_origin_cache(session)} saved Tier 2 origins")
+        
         # Query documents that are DECISIONS with extracted text
         logging.info("\nQuerying documents classified as decisions...")
         
-        query = session.query(
-            Document.document_id,
-            Document.metadata_data,
-            ExtractedText.raw_text,
-            Case.case_id,
-            Case.geographies
-        ).join(
-            ExtractedText, Document.document_id == ExtractedText.document_id
-        ).join(
-            Case, Document.case_id == Case.case_id
-        ).filter(
-            ExtractedText.raw_text != None,
-            Document.is_decision == True
-        )
+        query = documents_query(session)
         
         # Count total decisions
         total_decisions = query.count()
@@ -1834,21 +3301,21 @@ def main():
             trial_filtered_count = query.count()
             logging.info(f"After trial batch filter: {trial_filtered_count} documents")
         
-        # Exclude already processed
-        processed_ids = [
-            id[0] for id in 
-            session.query(CitationExtractionPhasedSummary.document_id).all()
-        ]
-        if processed_ids:
-            query = query.filter(~Document.document_id.in_(processed_ids))
-            logging.info(f"Excluding {len(processed_ids)} already processed documents")
+        # Exclude already processed (anti-join evaluated by PostgreSQL)
+        processed_count = session.query(CitationExtractionPhasedSummary).count()
+        if processed_count:
+            query = query.filter(~exists().where(
+                CitationExtractionPhasedSummary.document_id == Document.document_id
+            ))
+            logging.info(f"Excluding {processed_count} already processed documents")
         
-        # Get final list
-        documents = query.all()
+        # Rows are streamed from a server-side cursor rather than loaded at once
+        document_count = query.count()
+        documents = query.yield_per(DOCUMENT_FETCH_SIZE)
         
-        logging.info(f"\n✓ Documents to process: {len(documents)}")
+        logging.info(f"\n✓ Documents to process: {document_count}")
         
-        if len(documents) == 0:
+        if document_count == 0:
             logging.warning("\n⚠️  No documents to process!")
             logging.info("\nPossible reasons:")
             logging.info("1. All decisions have already been processed")
@@ -1856,8 +3323,8 @@ def main():
             logging.info("3. Trial batch filter excluded all documents")
             return
         
-        # Initialize statistics
-        stats = {
+        # Initialize statistics (a Counter, so per-document Counters add in)
+        stats = Counter({
             'processed': 0,
             'total_references': 0,
             'foreign_citations': 0,
@@ -1866,6 +3333,7 @@ def main():
             'needs_review': 0,
             'phase2_failures': 0,
             'no_citations': 0,
+            'pre_filtered': 0,
             'errors': 0,
             # Functional classification stats
             'functional_parties': 0,
@@ -1873,15 +3341,31 @@ def main():
             'functional_contributed': 0,
             'majority_citations': 0,
             'dissent_citations': 0
-        }
+        })
+        
+        # Phase 2A up front through the Batches API; the loop then reads the cache.
+        # The prefetch streams the query once more rather than holding every
+        # document's raw_text between the two passes
+        if CONFIG.get('BATCH_MODE'):
+            logging.info("\nBATCH_MODE: submitting Phase 2A extraction via Message Batches...")
+            prefetch_extractions_batch(documents)
+        elif CONFIG.get('PACK_MODE'):
+            logging.info("\nPACK_MODE: extracting short documents several per Phase 2A call...")
+            prefetch_extractions_packed(documents)
         
         # Process each document
         logging.info("\n" + "="*70)
         logging.info("STARTING FULL-TEXT EXTRACTION")
         logging.info("="*70)
         
-        for doc in tqdm(documents, desc="Processing Documents"):
-            process_single_document_phased(doc, session, stats)
+        if DOCUMENT_PROCESSES > 1:
+            logging.info(f"Sharding documents over {DOCUMENT_PROCESSES} worker processes")
+            # Workers fetch their own rows; only ids are read here and pickled
+            document_ids = [row.document_id for row in
+                            query.with_entities(Document.document_id).yield_per(DOCUMENT_FETCH_SIZE * 10)]
+            process_documents_sharded(document_ids, stats)
+        else:
+            asyncio.run(process_documents_async(documents, Session, stats, document_count))
         
         # Report final statistics
         logging.info("\n" + "="*70)
@@ -1890,6 +3374,7 @@ def main():
         logging.info(f"Total decisions in database:     {total_decisions}")
         logging.info(f"Documents processed:             {stats['processed']}")
         logging.info(f"Documents with no citations:     {stats['no_citations']}")
+        logging.info(f"Skipped by prefilter:            {stats['pre_filtered']}")
         logging.info(f"Phase 2 failures:                {stats['phase2_failures']}")
         logging.info(f"Other errors:                    {stats['errors']}")
         logging.info("")
@@ -1928,4 +3413,25 @@ def main():
 
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        description="Extract and classify cross-jurisdictional citations (v5.3)"
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        help='Directory for cached Phase 2A results keyed by document content (default: disabled)'
+    )
+    parser.add_argument(
+        '--processes',
+        type=int,
+        default=DOCUMENT_PROCESSES,
+        help='Worker processes, each with its own DB sessions and API client (default: 1)'
+    )
+    
+    args = parser.parse_args()
+    PHASE2_CACHE_DIR = args.cache_dir
+    DOCUMENT_PROCESSES = max(1, args.processes)
+    
     main()
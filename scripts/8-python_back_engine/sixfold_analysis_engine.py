@@ -46,11 +46,11 @@ print("DEBUG: Starting sixfold_analysis_engine.py...", file=sys.stdout, flush=Tr
 import os
 import json
 import logging
-from datetime import datetime
-from decimal import Decimal
+import concurrent.futures
+from datetime import date, datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field
 from enum import Enum
 from dotenv import load_dotenv
 
@@ -67,10 +67,18 @@ from sqlalchemy import (
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.dialects.postgresql import JSONB, ARRAY
 from sqlalchemy.exc import SQLAlchemyError
+import psycopg2.extensions
 
 # Data manipulation
+import numpy as np
 import pandas as pd
 
+# Optional: C JSON encoder for exports and result_data (pip install orjson)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
@@ -113,6 +121,10 @@ else:
     DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     logger.info("Database: LOCAL (development)")
 
+# Section queries are independent aggregates, so up to this many run at once,
+# each on its own pooled connection (pool_size 5 + max_overflow 10)
+QUERY_CONCURRENCY = int(os.getenv('SIXFOLD_QUERY_CONCURRENCY', '8'))
+
 # Output directories for external data storage
 # In production (Railway), use /tmp which is writable
 # In development, use local directory
@@ -221,18 +233,92 @@ JURISDICTION_COORDINATES = {
 }
 
 
+# =============================================================================
+# DATABASE TYPE CASTS
+# =============================================================================
+
+def _cast_numeric(value: Optional[str], cursor):
+    """
+    psycopg2 typecaster for NUMERIC: int when integral (counts, SUMs),
+    else float (ratios, ROUNDs, NaN, Infinity).
+    """
+    if value is None:
+        return None
+    if '.' in value or value[-1].isalpha():
+        return float(value)
+    return int(value)
+
+# Registered globally: every psycopg2 cursor returns numbers, never Decimal,
+# so query rows go straight to json / orjson / jsonify
+NUMERIC_TO_NUMBER = psycopg2.extensions.new_type(
+    psycopg2.extensions.DECIMAL.values, 'NUMERIC_TO_NUMBER', _cast_numeric
+)
+psycopg2.extensions.register_type(NUMERIC_TO_NUMBER)
+
+
 # =============================================================================
 # DATA CLASSES - Structured Results
 # =============================================================================
 
-class DecimalEncoder(json.JSONEncoder):
-    """JSON encoder that handles Decimal types."""
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        return super(DecimalEncoder, self).default(obj)
+# Exact type -> encoder, looked up once per non-native value
+_JSON_DISPATCH = {
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+}
+
+def _json_default(obj):
+    """json / orjson fallback hook: datetime and date -> ISO 8601 string."""
+    fn = _JSON_DISPATCH.get(type(obj))
+    if fn is not None:
+        return fn(obj)
+    # Subclasses miss the exact-type lookup
+    for base, fn in _JSON_DISPATCH.items():
+        if isinstance(obj, base):
+            return fn(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
 
-@dataclass
+def dumps_json(obj) -> str:
+    """
+    Serialize to a compact JSON string: orjson (encoder loop in C) when
+    installed, otherwise stdlib json.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, default=_json_default)
+
+def write_json(path: Path, obj):
+    """Write obj to path as indented UTF-8 JSON."""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(obj, default=_json_default,
+                                      option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, indent=2, ensure_ascii=False, default=_json_default)
+
+def iter_jsonl(header: Dict, rows: List[Dict]):
+    """
+    Yield JSON Lines as bytes: the header object first, then one line per
+    row. Rows are encoded one at a time, so no full-document string is built.
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+        yield orjson.dumps(header, default=_json_default, option=option)
+        for row in rows:
+            yield orjson.dumps(row, default=_json_default, option=option)
+        return
+    for obj in (header, *rows):
+        yield (json.dumps(obj, ensure_ascii=False, default=_json_default) + '\n').encode('utf-8')
+
+def read_jsonl(path: Path) -> Tuple[Dict, List[Dict]]:
+    """Read a file written by AnalysisResult.stream_to: (header, rows)."""
+    loads = orjson.loads if orjson is not None else json.loads
+    with open(path, 'rb') as f:
+        header = loads(f.readline())
+        rows = [loads(line) for line in f if line.strip()]
+    return header, rows
+
+@dataclass(slots=True)
 class AnalysisResult:
     """
     Container for a single analysis query result.
@@ -247,15 +333,47 @@ class AnalysisResult:
     row_count: int          # Number of rows returned
     executed_at: datetime   # Timestamp of execution
     
+    # executed_at.isoformat(), filled on first to_dict (API requests repeat it)
+    _executed_at_iso: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
     def to_dict(self) -> Dict:
-        """Convert to dictionary for JSON serialization."""
+        """
+        Convert to dictionary for JSON serialization.
+        Fields are read directly: asdict() would deep-copy every row in data.
+        """
+        if self._executed_at_iso is None:
+            self._executed_at_iso = self.executed_at.isoformat()
         return {
-            **asdict(self),
-            'executed_at': self.executed_at.isoformat()
+            'query_id': self.query_id,
+            'section': self.section,
+            'category': self.category,
+            'description': self.description,
+            'query_type': self.query_type,
+            'data': self.data,
+            'row_count': self.row_count,
+            'executed_at': self._executed_at_iso
         }
+    
+    def stream_to(self, path: Path):
+        """
+        Write as JSON Lines: metadata header line, then one line per data
+        row (read back with read_jsonl).
+        """
+        header = self.to_dict()
+        del header['data']
+        with open(path, 'wb') as f:
+            f.writelines(iter_jsonl(header, self.data))
+    
+    @staticmethod
+    def dumps_many(results: List['AnalysisResult']) -> str:
+        """
+        Serialize a list of results as one JSON array: the dicts are built
+        first, then encoded in a single dumps_json call.
+        """
+        return dumps_json([r.to_dict() for r in results])
 
 
-@dataclass
+@dataclass(slots=True)
 class NetworkEdge:
     """
     Represents a citation network edge for visualization.
@@ -272,10 +390,85 @@ class NetworkEdge:
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON/CSV export."""
-        return asdict(self)
+        return {
+            'source': self.source,
+            'target': self.target,
+            'source_type': self.source_type,
+            'target_type': self.target_type,
+            'source_region': self.source_region,
+            'target_region': self.target_region,
+            'weight': self.weight,
+            'sixfold_type': self.sixfold_type
+        }
+
+
+# Column order of EdgeTable.frame (= NetworkEdge fields, edges.json/csv layout)
+EDGE_COLUMNS = (
+    'source', 'target', 'source_type', 'target_type',
+    'source_region', 'target_region', 'weight', 'sixfold_type'
+)
+
+# Low-cardinality EdgeTable columns (a handful of regions / node types /
+# sixfold types) stored as pandas Categorical: int8 codes + one label list
+EDGE_CATEGORY_COLUMNS = (
+    'source_type', 'target_type', 'source_region', 'target_region', 'sixfold_type'
+)
+
+
+@dataclass(slots=True)
+class EdgeTable:
+    """
+    Citation network edges as a struct of arrays: one DataFrame column per
+    NetworkEdge field, plus integer node codes so degrees and adjacency can
+    be computed with vector operations instead of per-edge attribute access.
+    """
+    frame: pd.DataFrame     # One row per edge, columns in EDGE_COLUMNS order
+    node_ids: np.ndarray    # Node label for each integer code
+    source_ids: np.ndarray  # int32 code of each edge's source node
+    target_ids: np.ndarray  # int32 code of each edge's target node
+    
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> 'EdgeTable':
+        """Wrap an edge DataFrame, coding source and target over one node index."""
+        frame = frame.loc[:, list(EDGE_COLUMNS)].reset_index(drop=True)
+        for column in EDGE_CATEGORY_COLUMNS:
+            frame[column] = frame[column].astype('category')
+        codes, node_ids = pd.factorize(pd.concat([frame['source'], frame['target']], ignore_index=True))
+        n_edges = len(frame)
+        node_ids = np.asarray(node_ids, dtype=object)
+        source_ids = codes[:n_edges].astype(np.int32)
+        target_ids = codes[n_edges:].astype(np.int32)
+        
+        # Endpoint names become codes into the one node label array, so each
+        # jurisdiction name is stored once rather than twice per edge
+        node_labels = pd.Index(node_ids, dtype=object)
+        frame['source'] = pd.Categorical.from_codes(source_ids, categories=node_labels)
+        frame['target'] = pd.Categorical.from_codes(target_ids, categories=node_labels)
+        
+        return cls(
+            frame=frame,
+            node_ids=node_ids,
+            source_ids=source_ids,
+            target_ids=target_ids
+        )
+    
+    @classmethod
+    def empty(cls) -> 'EdgeTable':
+        return cls.from_frame(pd.DataFrame(columns=list(EDGE_COLUMNS)))
+    
+    def __len__(self) -> int:
+        return len(self.frame)
+    
+    def to_edge_dicts(self) -> List[Dict]:
+        """Edge rows as NetworkEdge.to_dict-shaped dicts (export time only)."""
+        return self.frame.to_dict('records')
+    
+    def to_edges(self) -> List[NetworkEdge]:
+        """Materialize NetworkEdge objects, for callers that want rows."""
+        return [NetworkEdge(**row) for row in self.to_edge_dicts()]
 
 
-@dataclass
+@dataclass(slots=True)
 class NodeAttributes:
     """
     Attributes for network visualization nodes.
@@ -291,8 +484,23 @@ class NodeAttributes:
     lon: Optional[float] = None  # Longitude
     
     def to_dict(self) -> Dict:
-        """Convert to dictionary for JSON export."""
-        return asdict(self)
+        """
+        Convert to dictionary for JSON export.
+        lat/lon are left out when unknown rather than emitted as nulls.
+        """
+        node = {
+            'node_id': self.node_id,
+            'node_type': self.node_type,
+            'label': self.label,
+            'region': self.region,
+            'in_degree': self.in_degree,
+            'out_degree': self.out_degree,
+            'total_degree': self.total_degree
+        }
+        if self.lat is not None:
+            node['lat'] = self.lat
+            node['lon'] = self.lon
+        return node
 
 
 # =============================================================================
@@ -339,7 +547,7 @@ class SixfoldAnalysisEngine:
         self.results: Dict[str, AnalysisResult] = {}
         
         # Network data storage
-        self.network_edges: List[NetworkEdge] = []
+        self.network_edges: EdgeTable = EdgeTable.empty()
         self.node_attributes: Dict[str, NodeAttributes] = {}
         
         # Dashboard aggregates
@@ -468,7 +676,7 @@ class SixfoldAnalysisEngine:
                 'query_type': result.query_type,
                 'description': result.description,
                 'query_type': result.query_type,
-                'result_data': json.dumps(result.data, cls=DecimalEncoder),
+                'result_data': dumps_json(result.data),
                 'row_count': result.row_count,
                 'executed_at': result.executed_at
             })
@@ -490,12 +698,14 @@ class SixfoldAnalysisEngine:
             
         Returns:
         --------
-        List[Dict] : Query results
+        List[Dict] : Query results (NUMERIC arrives as int/float, see
+                     NUMERIC_TO_NUMBER)
         """
         with self.engine.connect() as conn:
             result = conn.execute(text(sql), params or {})
             columns = result.keys()
-            return [dict(zip(columns, row)) for row in result.fetchall()]
+            rows = [dict(zip(columns, row)) for row in result.fetchall()]
+        return rows
     
     def query_0_1_total_by_classification(self) -> AnalysisResult:
         """
@@ -1593,13 +1803,13 @@ class SixfoldAnalysisEngine:
     # NETWORK DATA GENERATION
     # =========================================================================
     
-    def generate_jurisdiction_network(self) -> List[NetworkEdge]:
+    def generate_jurisdiction_network(self) -> EdgeTable:
         """
         Generate jurisdiction-level network edges for visualization.
         
         Input: citation_sixfold_classification view
         Algorithm: Aggregate citations by source_jurisdiction → case_law_origin
-        Output: List of NetworkEdge objects with weights
+        Output: EdgeTable (one column per NetworkEdge field) with weights
         """
         sql = """
             SELECT 
@@ -1619,27 +1829,21 @@ class SixfoldAnalysisEngine:
         
         data = self._execute_query(sql)
         
-        edges = []
-        for row in data:
-            # Get coordinates for source and target
-            source_coords = JURISDICTION_COORDINATES.get(row['source_jurisdiction'], {})
-            target_coords = JURISDICTION_COORDINATES.get(row['case_law_origin'], {})
-            
-            edge = NetworkEdge(
-                source=row['source_jurisdiction'],
-                target=row['case_law_origin'],
-                source_type='jurisdiction',
-                target_type='jurisdiction',
-                source_region=row['source_region'] or 'Unknown',
-                target_region=row['case_law_region'] or 'Unknown',
-                weight=row['weight'],
-                sixfold_type=row['sixfold_type']
-            )
-            # Add coordinates dynamically since they are not in __init__
-            # Note: NetworkEdge is a dataclass, so we can't easily add fields without changing definition
-            # But we added them to NodeAttributes, which is where they are needed for the map
-
-            edges.append(edge)
+        frame = pd.DataFrame.from_records(data, columns=[
+            'source_jurisdiction', 'case_law_origin', 'source_region',
+            'case_law_region', 'sixfold_type', 'weight'
+        ]).rename(columns={
+            'source_jurisdiction': 'source',
+            'case_law_origin': 'target',
+            'case_law_region': 'target_region'
+        })
+        frame['source_type'] = 'jurisdiction'
+        frame['target_type'] = 'jurisdiction'
+        frame['source_region'] = frame['source_region'].fillna('Unknown')
+        frame['target_region'] = frame['target_region'].fillna('Unknown')
+        frame['weight'] = frame['weight'].astype(np.int64)
+        
+        edges = EdgeTable.from_frame(frame)
         
         self.network_edges = edges
         logger.info(f"Generated {len(edges)} jurisdiction network edges")
@@ -1649,32 +1853,37 @@ class SixfoldAnalysisEngine:
         """
         Generate node attributes for network visualization.
         
-        Input: Network edges
-        Algorithm: Calculate in-degree, out-degree, total degree for each node
+        Input: Network edges (EdgeTable)
+        Algorithm: Weighted in/out-degree per node code with np.bincount;
+                   region = the node's last-seen endpoint region
         Output: Dictionary of NodeAttributes keyed by node_id
         """
-        # Calculate degrees from edges
-        in_degree: Dict[str, int] = {}
-        out_degree: Dict[str, int] = {}
-        node_regions: Dict[str, str] = {}
-        
-        for edge in self.network_edges:
-            # Out-degree for source
-            out_degree[edge.source] = out_degree.get(edge.source, 0) + edge.weight
-            node_regions[edge.source] = edge.source_region
-            
-            # In-degree for target
-            in_degree[edge.target] = in_degree.get(edge.target, 0) + edge.weight
-            node_regions[edge.target] = edge.target_region
+        edges = self.network_edges
+        n_nodes = len(edges.node_ids)
+        weight = edges.frame['weight'].to_numpy(dtype=np.int64)
+        
+        # Degrees for every node in one C pass each (weights sum citations)
+        out_degree = np.bincount(edges.source_ids, weights=weight, minlength=n_nodes).astype(np.int64)
+        in_degree = np.bincount(edges.target_ids, weights=weight, minlength=n_nodes).astype(np.int64)
+        total_degree = in_degree + out_degree
+        
+        # Endpoints in edge order (source, target, source, ...); each node
+        # takes the region of its last appearance
+        endpoint_codes = np.column_stack((edges.source_ids, edges.target_ids)).ravel()
+        endpoint_regions = np.column_stack((
+            edges.frame['source_region'].to_numpy(dtype=object),
+            edges.frame['target_region'].to_numpy(dtype=object)
+        )).ravel()
+        last_seen = np.full(n_nodes, -1, dtype=np.int64)
+        np.maximum.at(last_seen, endpoint_codes, np.arange(len(endpoint_codes)))
+        node_regions = endpoint_regions[last_seen]
         
         # Create node attributes
-        all_nodes = set(in_degree.keys()) | set(out_degree.keys())
         nodes = {}
-        
-        for node_id in all_nodes:
-            in_d = in_degree.get(node_id, 0)
-            out_d = out_degree.get(node_id, 0)
-            
+        for node_id, in_d, out_d, total_d, region in zip(
+            edges.node_ids.tolist(), in_degree.tolist(), out_degree.tolist(),
+            total_degree.tolist(), node_regions.tolist()
+        ):
             # Get coordinates
             coords = JURISDICTION_COORDINATES.get(node_id, {})
             
@@ -1682,10 +1891,10 @@ class SixfoldAnalysisEngine:
                 node_id=node_id,
                 node_type='jurisdiction',
                 label=node_id,
-                region=node_regions.get(node_id, 'Unknown'),
+                region=region,
                 in_degree=in_d,
                 out_degree=out_d,
-                total_degree=in_d + out_d,
+                total_degree=total_d,
                 lat=coords.get('lat'),
                 lon=coords.get('lon')
             )
@@ -1711,24 +1920,24 @@ class SixfoldAnalysisEngine:
             self.generate_node_attributes()
         
         # Export edges to JSON
-        edges_json = [e.to_dict() for e in self.network_edges]
-        with open(NETWORK_DIR / 'edges.json', 'w', encoding='utf-8') as f:
-            json.dump(edges_json, f, indent=2, ensure_ascii=False, cls=DecimalEncoder)
+        edges_json = self.network_edges.to_edge_dicts()
+        write_json(NETWORK_DIR / 'edges.json', edges_json)
         
-        # Export edges to CSV
-        edges_df = pd.DataFrame(edges_json)
-        edges_df.to_csv(NETWORK_DIR / 'edges.csv', index=False)
+        # Export edges to CSV straight from the columnar table (no per-edge dicts)
+        self.network_edges.frame.to_csv(NETWORK_DIR / 'edges.csv', index=False)
         
         # Export nodes to JSON
         nodes_json = {k: v.to_dict() for k, v in self.node_attributes.items()}
-        with open(NETWORK_DIR / 'nodes.json', 'w', encoding='utf-8') as f:
-            json.dump(nodes_json, f, indent=2, ensure_ascii=False, cls=DecimalEncoder)
+        write_json(NETWORK_DIR / 'nodes.json', nodes_json)
         
         # Export nodes to CSV
-        nodes_df = pd.DataFrame([v.to_dict() for v in self.node_attributes.values()])
+        # Fixed columns: to_dict omits lat/lon for nodes without coordinates
+        nodes_df = pd.DataFrame([v.to_dict() for v in self.node_attributes.values()],
+                                columns=list(NodeAttributes.__dataclass_fields__))
         nodes_df.to_csv(NETWORK_DIR / 'nodes.csv', index=False)
         
         # Export D3.js-compatible format
+        edge_frame = self.network_edges.frame
         d3_data = {
             'nodes': [
                 {
@@ -1745,16 +1954,18 @@ class SixfoldAnalysisEngine:
             ],
             'links': [
                 {
-                    'source': edge.source,
-                    'target': edge.target,
-                    'value': edge.weight,
-                    'type': edge.sixfold_type
+                    'source': source,
+                    'target': target,
+                    'value': weight,
+                    'type': sixfold_type
                 }
-                for edge in self.network_edges
+                for source, target, weight, sixfold_type in zip(
+                    edge_frame['source'].tolist(), edge_frame['target'].tolist(),
+                    edge_frame['weight'].tolist(), edge_frame['sixfold_type'].tolist()
+                )
             ]
         }
-        with open(NETWORK_DIR / 'd3_network.json', 'w', encoding='utf-8') as f:
-            json.dump(d3_data, f, indent=2, ensure_ascii=False, cls=DecimalEncoder)
+        write_json(NETWORK_DIR / 'd3_network.json', d3_data)
         
         logger.info(f"Network data exported to {NETWORK_DIR}")
     
@@ -1866,21 +2077,16 @@ class SixfoldAnalysisEngine:
         self.dashboard_data = dashboard
         
         # Save to files
-        with open(DASHBOARD_DIR / 'summary_stats.json', 'w', encoding='utf-8') as f:
-            json.dump(dashboard['summary_stats'], f, indent=2, ensure_ascii=False, cls=DecimalEncoder)
+        write_json(DASHBOARD_DIR / 'summary_stats.json', dashboard['summary_stats'])
         
-        with open(DASHBOARD_DIR / 'category_breakdown.json', 'w', encoding='utf-8') as f:
-            json.dump(dashboard['category_breakdown'], f, indent=2, ensure_ascii=False, cls=DecimalEncoder)
+        write_json(DASHBOARD_DIR / 'category_breakdown.json', dashboard['category_breakdown'])
         
-        with open(DASHBOARD_DIR / 'regional_flows.json', 'w', encoding='utf-8') as f:
-            json.dump(dashboard['regional_flows'], f, indent=2, ensure_ascii=False, cls=DecimalEncoder)
+        write_json(DASHBOARD_DIR / 'regional_flows.json', dashboard['regional_flows'])
         
-        with open(DASHBOARD_DIR / 'comparative.json', 'w', encoding='utf-8') as f:
-            json.dump(dashboard['comparative'], f, indent=2, ensure_ascii=False, cls=DecimalEncoder)
+        write_json(DASHBOARD_DIR / 'comparative.json', dashboard['comparative'])
         
         # Complete dashboard bundle for frontend
-        with open(DASHBOARD_DIR / 'dashboard_complete.json', 'w', encoding='utf-8') as f:
-            json.dump(dashboard, f, indent=2, ensure_ascii=False, cls=DecimalEncoder)
+        write_json(DASHBOARD_DIR / 'dashboard_complete.json', dashboard)
         
         logger.info(f"Dashboard aggregates exported to {DASHBOARD_DIR}")
     
@@ -1891,6 +2097,7 @@ class SixfoldAnalysisEngine:
     def run_all_queries(self) -> Dict[str, AnalysisResult]:
         """
         Execute all analysis queries and store results.
+        Queries run concurrently on QUERY_CONCURRENCY pooled connections.
         
         Returns:
         --------
@@ -1898,62 +2105,71 @@ class SixfoldAnalysisEngine:
         """
         logger.info("Starting full query execution...")
         
-        # Section 0: Overall Summary
-        self.results['0.1'] = self.query_0_1_total_by_classification()
-        self.results['0.2'] = self.query_0_2_summary_by_direction()
-        
-        # Section 1: Foreign Citation
-        self.results['1.1'] = self.query_1_1_foreign_overview()
-        self.results['1.2'] = self.query_1_2_regional_flow_matrix()
-        self.results['1.3'] = self.query_1_3_top_source_jurisdictions()
-        self.results['1.4'] = self.query_1_4_top_cited_jurisdictions()
-        self.results['1.5'] = self.query_1_5_top_cited_cases()
-        
-        # Section 2: International Citation
-        self.results['2.1'] = self.query_2_1_international_overview()
-        self.results['2.2'] = self.query_2_2_by_source_region()
-        self.results['2.3'] = self.query_2_3_top_source_jurisdictions()
-        self.results['2.4'] = self.query_2_4_most_cited_tribunals()
-        self.results['2.5'] = self.query_2_5_top_cited_cases()
-        
-        # Section 3: Foreign International Citation
-        self.results['3.1'] = self.query_3_1_foreign_intl_overview()
-        self.results['3.2'] = self.query_3_2_by_source_region()
-        self.results['3.3'] = self.query_3_3_top_source_jurisdictions()
-        self.results['3.4'] = self.query_3_4_most_cited_tribunals()
-        self.results['3.5'] = self.query_3_5_top_cited_cases()
-        self.results['3.6'] = self.query_3_6_cross_system_citations()
-        
-        # Section 4: Inter-System Citation
-        self.results['4.1'] = self.query_4_1_intersystem_overview()
-        self.results['4.2'] = self.query_4_2_tribunal_to_tribunal_flows()
-        self.results['4.3'] = self.query_4_3_most_active_tribunals()
-        self.results['4.4'] = self.query_4_4_most_cited_tribunals()
-        self.results['4.5'] = self.query_4_5_top_cited_cases()
-        
-        # Section 5: Member-State Citation
-        self.results['5.1'] = self.query_5_1_member_state_overview()
-        self.results['5.2'] = self.query_5_2_by_cited_region()
-        self.results['5.3'] = self.query_5_3_top_source_tribunals()
-        self.results['5.4'] = self.query_5_4_most_cited_jurisdictions()
-        self.results['5.5'] = self.query_5_5_top_cited_cases()
-        
-        # Section 6: Non-Member Citation
-        self.results['6.1'] = self.query_6_1_non_member_overview()
-        self.results['6.2'] = self.query_6_2_by_cited_region()
-        self.results['6.3'] = self.query_6_3_top_source_tribunals()
-        self.results['6.4'] = self.query_6_4_most_cited_jurisdictions()
-        self.results['6.5'] = self.query_6_5_top_cited_cases()
-        self.results['6.6'] = self.query_6_6_cross_regional_citations()
-        
-        # Section 7: Comparative Analysis
-        self.results['7.1'] = self.query_7_1_decisions_by_types()
-        self.results['7.2'] = self.query_7_2_north_south_asymmetry()
-        self.results['7.3'] = self.query_7_3_global_south_engagement()
-        self.results['7.4'] = self.query_7_4_top_cited_overall()
-        
-        # Section 8: Export Summary
-        self.results['8.1'] = self.query_8_1_final_summary()
+        queries = [
+            # Section 0: Overall Summary
+            self.query_0_1_total_by_classification,
+            self.query_0_2_summary_by_direction,
+        
+            # Section 1: Foreign Citation
+            self.query_1_1_foreign_overview,
+            self.query_1_2_regional_flow_matrix,
+            self.query_1_3_top_source_jurisdictions,
+            self.query_1_4_top_cited_jurisdictions,
+            self.query_1_5_top_cited_cases,
+        
+            # Section 2: International Citation
+            self.query_2_1_international_overview,
+            self.query_2_2_by_source_region,
+            self.query_2_3_top_source_jurisdictions,
+            self.query_2_4_most_cited_tribunals,
+            self.query_2_5_top_cited_cases,
+        
+            # Section 3: Foreign International Citation
+            self.query_3_1_foreign_intl_overview,
+            self.query_3_2_by_source_region,
+            self.query_3_3_top_source_jurisdictions,
+            self.query_3_4_most_cited_tribunals,
+            self.query_3_5_top_cited_cases,
+            self.query_3_6_cross_system_citations,
+        
+            # Section 4: Inter-System Citation
+            self.query_4_1_intersystem_overview,
+            self.query_4_2_tribunal_to_tribunal_flows,
+            self.query_4_3_most_active_tribunals,
+            self.query_4_4_most_cited_tribunals,
+            self.query_4_5_top_cited_cases,
+        
+            # Section 5: Member-State Citation
+            self.query_5_1_member_state_overview,
+            self.query_5_2_by_cited_region,
+            self.query_5_3_top_source_tribunals,
+            self.query_5_4_most_cited_jurisdictions,
+            self.query_5_5_top_cited_cases,
+        
+            # Section 6: Non-Member Citation
+            self.query_6_1_non_member_overview,
+            self.query_6_2_by_cited_region,
+            self.query_6_3_top_source_tribunals,
+            self.query_6_4_most_cited_jurisdictions,
+            self.query_6_5_top_cited_cases,
+            self.query_6_6_cross_regional_citations,
+        
+            # Section 7: Comparative Analysis
+            self.query_7_1_decisions_by_types,
+            self.query_7_2_north_south_asymmetry,
+            self.query_7_3_global_south_engagement,
+            self.query_7_4_top_cited_overall,
+        
+            # Section 8: Export Summary
+            self.query_8_1_final_summary,
+        ]
+        
+        # Each query opens its own connection; psycopg2 releases the GIL while
+        # waiting on Postgres, so the round-trips overlap. map() keeps the
+        # original order in self.results
+        with concurrent.futures.ThreadPoolExecutor(max_workers=QUERY_CONCURRENCY) as executor:
+            for result in executor.map(lambda query: query(), queries):
+                self.results[result.query_id] = result
         
         logger.info(f"Executed {len(self.results)} queries successfully")
         return self.results
@@ -4,6 +4,9 @@ Central Configuration for phdMutley Project
 ===========================================
 Centralizes paths, database connections, constants, and jurisdiction logic.
 
+VERSION: 3.4 - Fast Excel Loading
+- Added read_database_excel helper (calamine engine, openpyxl fallback)
+
 VERSION: 3.3 - Trial Batch Support
 - Added TRIAL_BATCH_CONFIG for filtering specific documents
 - Preserved TEST_CONFIG for limiting row counts
@@ -26,11 +29,39 @@ PROJECT_ROOT = Path('/home/gusrodgs/Gus/cienciaDeDados/phdMutley')
 PDF_DOWNLOAD_DIR = PROJECT_ROOT / 'pdfs/downloaded'
 LOGS_DIR = PROJECT_ROOT / 'logs'
 DATABASE_FILE = PROJECT_ROOT / 'data/processed/baseFiltrada.xlsx'
+LLM_CACHE_FILE = PROJECT_ROOT / 'data/processed/anthropic_cache.sqlite'
 
 # Create directories immediately
 PDF_DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
 LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
+# Excel Loading
+# 'calamine' (pip install python-calamine, pandas >= 2.2) parses the workbook
+# in Rust; openpyxl is used when it is unavailable.
+EXCEL_ENGINE = 'calamine'
+EXCEL_FALLBACK_ENGINE = 'openpyxl'
+
+def read_database_excel(columns=None, path=None):
+    """
+    Load the Excel database (DATABASE_FILE by default) with the fast engine.
+    
+    columns: optional iterable of column names to keep; names missing from
+    the workbook are ignored instead of raising.
+    """
+    import pandas as pd
+
+    source = path or DATABASE_FILE
+    kwargs = {}
+    if columns is not None:
+        wanted = set(columns)
+        kwargs['usecols'] = lambda col: col in wanted
+
+    try:
+        return pd.read_excel(source, engine=EXCEL_ENGINE, **kwargs)
+    except (ImportError, ValueError):
+        # Engine not installed / not supported by this pandas version
+        return pd.read_excel(source, engine=EXCEL_FALLBACK_ENGINE, **kwargs)
+
 # Database Configuration
 DB_CONFIG = {
     'drivername': 'postgresql+psycopg2',
@@ -125,6 +156,12 @@ CONFIG = {
     'ANTHROPIC_API_KEY': os.getenv('ANTHROPIC_API_KEY'),
     'ANTHROPIC_MODEL': 'claude-haiku-4-5-20251001',  # Haiku for citation extraction
     'CLASSIFICATION_MODEL': 'claude-sonnet-4-5-20250929',  # Sonnet for classification
+    # Submit Phase 2A extraction through the Message Batches API (50% cost, async)
+    'BATCH_MODE': os.getenv('CITATION_BATCH_MODE', '').lower() in ('1', 'true', 'yes'),
+    # Pack several short documents into one Phase 2A call (fewer requests)
+    'PACK_MODE': os.getenv('CITATION_PACK_MODE', '').lower() in ('1', 'true', 'yes'),
+    # Skip Phase 2A for documents with no foreign/international name or reporter
+    'PREFILTER_MODE': os.getenv('CITATION_PREFILTER', '').lower() in ('1', 'true', 'yes'),
     
     # Model Specifications
     'MODEL_CONTEXT_WINDOW': 200000,